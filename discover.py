@@ -1,47 +1,182 @@
 # -*- coding: utf-8 -*-
+import functools
+import hashlib
+import itertools
+import json
+import mmap
 import os
 import re
 import sys
+from importlib import metadata
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
-from dataclasses import dataclass
+from html import escape
+from dataclasses import asdict, dataclass, field
 from typing import Dict, List, Optional
 
 try:
     from openpyxl import Workbook
-    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
+    from openpyxl.styles.borders import DEFAULT_BORDER
+    from openpyxl.styles.fonts import DEFAULT_FONT
+    from openpyxl.utils import get_column_letter
     HAS_OPENPYXL = True
 except ImportError:
     HAS_OPENPYXL = False
 
+try:
+    import xlsxwriter
+    HAS_XLSXWRITER = True
+except ImportError:
+    HAS_XLSXWRITER = False
+
 try:
     import javalang
     HAS_JAVALANG = True
 except ImportError:
     HAS_JAVALANG = False
 
+try:
+    import tree_sitter
+    import tree_sitter_java
+    TS_JAVA_PARSER = tree_sitter.Parser(tree_sitter.Language(tree_sitter_java.language()))
+    TS_JAVA_VERSION = metadata.version('tree-sitter-java')
+    HAS_TREE_SITTER = True
+except Exception:
+    # Além do ImportError: TypeError em versões antigas do py-tree-sitter (outra API de
+    # Language/Parser) e ValueError quando o ABI do tree-sitter-java não bate com o binding.
+    # O backend é opcional: qualquer falha aqui volta para o javalang.
+    HAS_TREE_SITTER = False
+
+# Parser da análise de regras de negócio: javalang, cujas métricas são a referência dos relatórios;
+# o tree-sitter (em C) só é usado quando o javalang não está instalado, pois mede o tamanho
+# do corpo no código-fonte e os números não coincidem. O identificador inclui a versão,
+# entra nas chaves de cache e é registrado no log.
+if HAS_JAVALANG:
+    AST_BACKEND = f"javalang {javalang.__version__}"
+elif HAS_TREE_SITTER:
+    AST_BACKEND = f"tree-sitter-java {TS_JAVA_VERSION}"
+else:
+    AST_BACKEND = None
+HAS_AST_BACKEND = AST_BACKEND is not None
+
 # --- Configurações ---
 # O caminho do projeto será solicitado via argumento de linha de comando.
 JAVA_FILE_EXT = '.java'
-JSF_FILE_EXT = ['.xhtml', '.jsf']
+# Tuplas: str.endswith aceita uma tupla e testa todos os sufixos em uma única chamada
+JSF_FILE_EXT = ('.xhtml', '.jsf')
+CONFIG_FILE_EXT = ('.properties', '.xml', '.yml', '.yaml')
+# Tipo de cada extensão de interesse da varredura: uma única consulta por arquivo decide
+# o despacho, e os demais arquivos são descartados ainda na leitura do diretório
+FILE_KIND_BY_EXT = {
+    JAVA_FILE_EXT: 'java',
+    **dict.fromkeys(JSF_FILE_EXT, 'jsf'),
+    **dict.fromkeys(CONFIG_FILE_EXT, 'config'),
+}
 OUTPUT_FOLDER = 'output'
 
+# Diretórios de VCS/IDE/ferramentas que não contêm fontes a analisar e nunca são percorridos
+SKIP_DIRS = frozenset({
+    '.git', 'node_modules',
+    '.idea', '.vscode', '.gradle', '.mvn',
+})
+
+# Saídas de build: ignoradas apenas fora de src/, onde `build`, `target` etc. podem ser
+# nomes legítimos de pacotes Java (ex.: com/acme/build). A pasta OUTPUT_FOLDER deste
+# script só é ignorada na raiz do projeto, pelo mesmo motivo.
+BUILD_DIRS = frozenset({'target', 'build', 'dist', 'out'})
+SOURCE_ROOT_DIR = 'src'
+
+# Arquivos maiores que isso são mapeados em memória (mmap) em vez de lidos por inteiro;
+# abaixo desse tamanho o custo de criar o mapeamento supera o da leitura direta
+MMAP_MIN_SIZE = 64 * 1024
+
+# Arquivos de configuração vazios ou maiores que isso (dumps, XMLs gerados) não são lidos
+CONFIG_MAX_SIZE = 2_000_000
+
+# Paralelismo: abaixo de PARALLEL_MIN_FILES o custo de iniciar processos supera o ganho
+# (contados apenas os .java, que concentram o custo de parsing). Lotes menores equilibram melhor
+# a carga entre os processos, já que o tempo de parsing varia muito de um arquivo para outro.
+PARALLEL_MIN_FILES = 256
+PARALLEL_BATCH_SIZE = 64
+
 # Código de erro amigável quando a pasta do projeto não é fornecida
 ERROR_CODE_MISSING_PROJECT = 2
+# Cache das métricas AST, dentro da pasta de saída do projeto analisado
+AST_CACHE_FOLDER = '.ast-cache'
+# Incrementar quando as heurísticas de regras de negócio mudarem, invalidando o cache existente
+AST_CACHE_VERSION = 3
+# Índice da classificação dos .java por (mtime, tamanho): arquivos inalterados nem chegam a ser abertos
+CLASSIFY_CACHE_FILE = '.classify-cache.json'
+# Chaves do cache AST: SHA-256 em hexadecimal (também evita caminhos arbitrários vindos do índice)
+AST_CACHE_KEY_RE = re.compile(r'[0-9a-f]{64}')
 
 # --- Estrutura de Dados para Análise de Regras de Negócios ---
-@dataclass
+@dataclass(slots=True)
 class BusinessRuleMetrics:
-    """Métricas de regras de negócio para uma classe"""
+    """Métricas de regras de negócio para uma classe (com __slots__: uma instância por classe analisada)"""
     class_name: str
     file_path: str
     controller_type: str
     public_methods: int = 0
     business_methods: int = 0
-    business_method_names: List[str] = None
-    
-    def __post_init__(self):
-        if self.business_method_names is None:
-            self.business_method_names = []
+    business_method_names: List[str] = field(default_factory=list)
+    business_method_label: str = ""  # Nomes unidos por ", ", preenchido por analyze_business_rules
+
+@dataclass
+class AnalysisResults:
+    """Resultados acumulados da análise de um projeto, consumidos pelos geradores de relatório"""
+    entity_classes: Dict[str, List[str]] = field(default_factory=dict)
+    business_components: Dict[str, List[str]] = field(default_factory=dict)
+    jsf_pages: List[str] = field(default_factory=list)
+    db_info_list: List[str] = field(default_factory=list)  # Uma linha por arquivo de configuração de DB
+    db_info: str = "Nenhuma informação de DB capturada de forma automática neste script."
+    class_metrics: List[BusinessRuleMetrics] = field(default_factory=list)  # Métricas AST por classe, coletadas na varredura
+    business_rules_metrics: Dict[str, any] = field(default_factory=dict)  # Populado por analyze_business_rules
+    rel_paths: Dict[str, str] = field(default_factory=dict)  # Caminho absoluto -> relativo, resolvido uma vez para todos os relatórios
+    entity_labels: Dict[str, str] = field(default_factory=dict)  # Padrões de cada entidade já unidos por ", "
+    component_labels: Dict[str, str] = field(default_factory=dict)  # Idem, para os componentes de negócio
+    log: List[str] = field(default_factory=list)  # Linhas do log, unidas apenas na geração dos relatórios
+
+    @property
+    def analysis_log(self) -> str:
+        return "".join(self.log)
+
+    @property
+    def has_db_config(self) -> bool:
+        return bool(self.db_info_list)
+
+# --- Estilos do Relatório Excel ---
+# Estilos do openpyxl são imutáveis: uma única instância é criada e compartilhada por todas as células.
+# Cores em ARGB de 8 dígitos, como o Excel espera.
+if HAS_OPENPYXL:
+    EXCEL_HEADER_FILL = PatternFill(start_color="FF4472C4", end_color="FF4472C4", fill_type="solid")
+    EXCEL_HEADER_FONT = Font(bold=True, color="FFFFFFFF", size=12)
+    EXCEL_TITLE_FONT = Font(bold=True, size=14, color="FFFFFFFF")
+    EXCEL_TITLE_FILL = PatternFill(start_color="FF203864", end_color="FF203864", fill_type="solid")
+    EXCEL_COUNT_FONT = Font(bold=True, size=11)
+    EXCEL_BORDER = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+    EXCEL_CENTER_ALIGN = Alignment(horizontal="center", vertical="center", wrap_text=True)
+    EXCEL_LEFT_ALIGN = Alignment(horizontal="left", vertical="top", wrap_text=True)
+
+    # Estilos nomeados registrados em cada workbook: a célula passa a referenciar um único estilo
+    # pelo nome, em vez de resolver fonte, preenchimento, borda e alinhamento um a um
+    EXCEL_NAMED_STYLES = {
+        'rnc_title': dict(font=EXCEL_TITLE_FONT, fill=EXCEL_TITLE_FILL),
+        'rnc_header': dict(font=EXCEL_HEADER_FONT, fill=EXCEL_HEADER_FILL, alignment=EXCEL_CENTER_ALIGN, border=EXCEL_BORDER),
+        'rnc_header_plain': dict(font=EXCEL_HEADER_FONT, fill=EXCEL_HEADER_FILL, alignment=EXCEL_CENTER_ALIGN),
+        'rnc_body': dict(alignment=EXCEL_LEFT_ALIGN, border=EXCEL_BORDER),
+        'rnc_text': dict(alignment=EXCEL_LEFT_ALIGN),
+        'rnc_count': dict(font=EXCEL_COUNT_FONT, alignment=EXCEL_CENTER_ALIGN),
+        'rnc_bold': dict(font=EXCEL_COUNT_FONT),
+    }
 
 # --- Padrões Comuns de Anotações/Arquivos ---
 ENTITY_PATTERNS = [
@@ -58,102 +193,419 @@ BUSINESS_PATTERNS = [
     r'extends.*Controller\b',
 ]
 
-# --- Variáveis de Contagem ---
-entity_classes = {}
-jsf_pages = []
-business_components = {}
-db_info_placeholder = "Nenhuma informação de DB capturada de forma automática neste script."
-analysis_log = ""
+# Alternação pré-compilada com entidades e componentes de negócio: um grupo nomeado por padrão
+# (e0, e1, ... / b0, b1, ...) permite identificar todos os padrões com uma única passada sobre o conteúdo.
+# Cada grupo fica dentro de um lookahead para não consumir texto (ex.: `extends.*Controller` engoliria
+# uma anotação posterior na mesma linha). Os padrões são ASCII, então a busca é feita sobre bytes.
+JAVA_PATTERNS_RE = re.compile(b"|".join(
+    [b"(?=(?P<e%d>%s))" % (i, p.encode()) for i, p in enumerate(ENTITY_PATTERNS)] +
+    [b"(?=(?P<b%d>%s))" % (i, p.encode()) for i, p in enumerate(BUSINESS_PATTERNS)]
+))
+
+# Trechos literais dos quais todo padrão acima depende (`Controller` cobre @Controller,
+# @RestController e extends...Controller). Sem nenhum deles a regex não tem como casar, e a
+# busca literal (bytes.find) é dezenas de vezes mais rápida que a alternação de lookaheads.
+# Manter em sincronia com ENTITY_PATTERNS e BUSINESS_PATTERNS.
+JAVA_PATTERN_MARKERS = (b'@Entity', b'@Table', b'@Named', b'@Service', b'@ManagedBean', b'Controller')
+
+# Padrões de configuração de banco de dados, compilados uma única vez.
+# `spring.datasource.url` também indica uma URL JDBC, por isso o sufixo `url` tem grupo próprio;
+# o lookahead em `jdbc` evita que o trecho consumido esconda outros padrões na mesma linha.
+DB_CONFIG_RE = re.compile(
+    rb'(?P<spring>spring\.datasource(?P<spring_url>.url)?)'
+    rb'|(?P<jdbc>jdbc(?=:|.*url)|spring.datasource.url)'
+    rb'|(?P<dialect>hibernate\.dialect)',
+    re.IGNORECASE,
+)
+DB_CONFIG_LABELS = {
+    'jdbc': "Possível URL JDBC",
+    'dialect': "Dialeto Hibernate/JPA",
+    'spring': "Configuração Spring Datasource",
+}
+
+# Tamanho (em caracteres da representação da AST) a partir do qual um método é considerado
+# lógica de negócio por si só; a estimativa do tamanho do corpo para de contar ao passar dele
+BODY_SIZE_LIMIT = 1000
+
+# --- Variáveis de Execução ---
 PROJECT_PATH = ""  # Será definido na execução
-business_rules_metrics = {}  # Armazenar métricas de regras de negócio (será populado por analyze_business_rules)
+RUN_STARTED = None  # Instante da execução (datetime), definido uma única vez em __main__
+RUN_TIMESTAMP = ""  # RUN_STARTED formatado, reutilizado nos relatórios
+
+def find_pattern_groups(regex, content):
+    """Retorna os nomes dos grupos que casaram no conteúdo."""
+    first = regex.search(content)
+    if first is None:
+        return set()
+    # Só coleta os demais grupos a partir da primeira ocorrência
+    return {m.lastgroup for m in regex.finditer(content, first.start())}
+
+def select_patterns(groups, prefix, patterns):
+    """Converte os grupos encontrados de volta nos padrões, na ordem em que foram declarados."""
+    return [p for i, p in enumerate(patterns) if f"{prefix}{i}" in groups]
+
+def _iter_files(root, kinds):
+    """
+    Percorre a árvore a partir de `root` com os.scandir, gerando (DirEntry, tipo) para cada
+    arquivo cuja extensão está no dicionário `kinds` (extensão -> tipo).
+    O tipo de cada entrada vem do próprio diretório lido, evitando stat e os.path.join extras.
+    Diretórios em SKIP_DIRS não são visitados; os de BUILD_DIRS só fora de src/ e a pasta de
+    saída (OUTPUT_FOLDER) só na raiz.
+    """
+    stack = [(root, False)]
+    while stack:
+        directory, in_src = stack.pop()
+        subdirs = []
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        name = entry.name
+                        if name in SKIP_DIRS:
+                            continue
+                        if not in_src and (name in BUILD_DIRS or (name == OUTPUT_FOLDER and directory == root)):
+                            continue
+                        subdirs.append((entry.path, in_src or name == SOURCE_ROOT_DIR))
+                    else:
+                        name = entry.name
+                        kind = kinds.get(name[name.rfind('.'):])
+                        if kind is not None and entry.is_file():
+                            yield entry, kind
+        except OSError:
+            # Mesmo comportamento do os.walk: diretórios ilegíveis são ignorados
+            continue
+        # Empilhados ao contrário para que saiam na ordem da listagem (mesma pré-ordem do os.walk)
+        stack.extend(reversed(subdirs))
+
+@contextmanager
+def open_content(filepath):
+    """Disponibiliza o conteúdo binário do arquivo, mapeando em memória os arquivos grandes."""
+    with open(filepath, 'rb') as f:
+        if os.fstat(f.fileno()).st_size <= MMAP_MIN_SIZE:
+            yield f.read()
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, 'madvise'):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            yield mm
+
+def classify_java_content(filepath, content):
+    """
+    Classifica o conteúdo de um arquivo .java como Entidade ou Componente de Negócio.
+    Retorna uma tupla (tipo, caminho, dados) ou None se nada for encontrado.
+    """
+    # DTOs, código gerado etc. não contêm nenhum marcador e dispensam a regex
+    if not any(content.find(marker) != -1 for marker in JAVA_PATTERN_MARKERS):
+        return None
+    groups = find_pattern_groups(JAVA_PATTERNS_RE, content)
 
-def analyze_java_file(filepath):
-    """Analisa um arquivo .java para Entidades e Componentes de Negócio."""
-    global analysis_log
-    content = ""
+    # Entidades têm precedência: um arquivo com @Entity/@Table não é listado como componente de negócio
+    found_entity_patterns = select_patterns(groups, 'e', ENTITY_PATTERNS)
+    if found_entity_patterns:
+        return ('entity', filepath, found_entity_patterns)
+
+    found_business_patterns = select_patterns(groups, 'b', BUSINESS_PATTERNS)
+    if found_business_patterns:
+        return ('business', filepath, found_business_patterns)
+    return None
+
+def analyze_java_file(filepath, ast_cache_dir=None):
+    """
+    Analisa um arquivo .java lendo-o do disco uma única vez: o mesmo conteúdo alimenta
+    a classificação por regex e, se houver um parser Java disponível, a análise AST.
+    Retorna uma lista de tuplas (tipo, caminho, dados); a tupla 'cache' leva a entrada
+    do índice de classificação (sem o mtime/tamanho, conhecidos apenas por quem percorreu o diretório).
+    """
+    found = []
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
+        with open_content(filepath) as content:
+            result = classify_java_content(filepath, content)
+            metrics = ast_key = None
+            if HAS_AST_BACKEND:
+                ast_key = ast_cache_key(content)
+                cache_file = ast_cache_path(ast_cache_dir, ast_key) if ast_cache_dir else None
+                metrics = analyze_java_content_ast(filepath, content, cache_file)
     except Exception as e:
-        analysis_log += f"ERRO ao ler {filepath}: {e}\n"
-        return
+        return [('error', filepath, f"ERRO ao ler {filepath}: {e}\n")]
 
-    found_entity_patterns = [p for p in ENTITY_PATTERNS if re.search(p, content)]
-    if found_entity_patterns:
-        entity_classes[filepath] = found_entity_patterns
-
-    if not found_entity_patterns:
-        found_business_patterns = [p for p in BUSINESS_PATTERNS if re.search(p, content)]
-        if found_business_patterns:
-            business_components[filepath] = found_business_patterns
+    if result is not None:
+        found.append(result)
+    if metrics:
+        found.append(('ast', filepath, metrics))
+    kind, _, patterns = result if result is not None else (None, None, None)
+    found.append(('cache', filepath, [kind, patterns, ast_key]))
+    return found
 
 def analyze_jsf_file(filepath):
-    """Adiciona a página JSF à lista de encontrados."""
-    jsf_pages.append(filepath)
-
-def capture_database_info(project_root):
-    """Tenta capturar informações básicas do DB."""
-    global db_info_placeholder
-    db_info_list = []
-    config_files = ['.properties', '.xml', '.yml', '.yaml']
-
-    for root, _, files in os.walk(project_root):
-        for file in files:
-            if any(file.endswith(ext) for ext in config_files):
-                filepath = os.path.join(root, file)
-                try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        info = []
-                        if re.search(r'jdbc[:/]?.*url|jdbc:|spring.datasource.url', content, re.IGNORECASE):
-                            info.append("Possível URL JDBC")
-                        if re.search(r'hibernate\.dialect', content, re.IGNORECASE):
-                            info.append("Dialeto Hibernate/JPA")
-                        if re.search(r'spring\.datasource', content, re.IGNORECASE):
-                            info.append("Configuração Spring Datasource")
-                        if info:
-                            db_info_list.append(f"- **{os.path.basename(file)}** ({', '.join(info)}) em `{filepath}`")
-                except Exception:
-                    pass
-
-    if db_info_list:
-        db_info_placeholder = "### Arquivos de Configuração de Banco de Dados Encontrados\n" + "\n".join(db_info_list)
+    """Registra a página JSF; não há conteúdo a ler. Retorna uma tupla (tipo, caminho, dados)."""
+    return ('jsf', filepath, None)
+
+def find_db_config(content):
+    """Retorna as descrições das configurações de banco de dados presentes no conteúdo."""
+    hits = set()
+    for m in DB_CONFIG_RE.finditer(content):
+        hits.update(k for k, v in m.groupdict().items() if v)
+    if 'spring_url' in hits:
+        hits.add('jdbc')
+    return [label for key, label in DB_CONFIG_LABELS.items() if key in hits]
+
+def scan_config_file(filepath, filename):
+    """
+    Procura referências de banco de dados em um arquivo de configuração.
+    Retorna uma tupla (tipo, caminho, dados) ou None se nada for encontrado.
+    """
+    try:
+        with open_content(filepath) as content:
+            info = find_db_config(content)
+        if info:
+            return ('db', filepath, f"- **{filename}** ({', '.join(info)}) em `{filepath}`")
+    except Exception:
+        pass
+    return None
+
+def analyze_file_batch(batch, ast_cache_dir=None):
+    """
+    Analisa um lote de arquivos (.java e de configuração) sem alterar o estado global,
+    para que possa ser executado em processos separados.
+    """
+    results = []
+    for filepath, filename in batch:
+        if filename.endswith(JAVA_FILE_EXT):
+            results.extend(analyze_java_file(filepath, ast_cache_dir))
+        else:
+            result = scan_config_file(filepath, filename)
+            if result is not None:
+                results.append(result)
+    return results
+
+def write_json_atomic(path, data):
+    """
+    Grava `data` em JSON de forma atômica: outros processos nunca leem um arquivo incompleto.
+    Falhas são ignoradas, pois só os caches são gravados assim.
+    """
+    tmp_file = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp_file, path)
+    except Exception:
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass
+
+def classify_cache_signature():
+    """Tudo de que a classificação depende; um índice gravado com outra assinatura é descartado."""
+    return [ENTITY_PATTERNS, BUSINESS_PATTERNS, AST_BACKEND, AST_CACHE_VERSION]
+
+def load_classify_cache(cache_file):
+    """Lê o índice de classificação; ausente, ilegível ou de outra versão equivale a vazio."""
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('signature') == classify_cache_signature() and isinstance(data.get('files'), dict):
+            return data['files']
+    except Exception:
+        pass
+    return {}
+
+def save_classify_cache(cache_file, entries):
+    """Grava o índice de classificação de forma atômica."""
+    write_json_atomic(cache_file, {'signature': classify_cache_signature(), 'files': entries})
+
+def is_valid_classify_entry(cached) -> bool:
+    """
+    Confere o formato de uma entrada do índice: [mtime_ns, tamanho, tipo, padrões, chave AST].
+    O índice fica dentro do projeto analisado; entradas fora do formato contam como ausentes.
+    """
+    if not isinstance(cached, list) or len(cached) != 5:
+        return False
+    kind, patterns, ast_key = cached[2:]
+    if kind is None:
+        if patterns is not None:
+            return False
+    elif kind not in ('entity', 'business') or not isinstance(patterns, list) \
+            or not all(isinstance(p, str) for p in patterns):
+        return False
+    return ast_key is None or (isinstance(ast_key, str) and AST_CACHE_KEY_RE.fullmatch(ast_key) is not None)
+
+def restore_cached_java_file(filepath, cached, signature, ast_cache_dir):
+    """
+    Reconstrói os resultados de um .java a partir do índice de classificação, sem ler o arquivo.
+    Retorna None se o arquivo mudou (mtime/tamanho) ou se as métricas AST saíram do cache.
+    """
+    if signature is None or not is_valid_classify_entry(cached) or cached[:2] != signature:
+        return None
+    kind, patterns, ast_key = cached[2:]
+    found = []
+    if kind is not None:
+        found.append((kind, filepath, patterns))
+    if ast_key is not None:
+        try:
+            metrics = load_cached_metrics(ast_cache_path(ast_cache_dir, ast_key), filepath)
+        except Exception:
+            return None
+        if metrics:
+            found.append(('ast', filepath, metrics))
+    found.append(('cache', filepath, cached[2:]))
+    return found
+
+def record_result(result, results):
+    """Incorpora aos resultados da análise o que foi encontrado em um arquivo."""
+    kind, filepath, data = result
+    # Padrões e nomes de método se repetem em milhares de arquivos, mas chegam dos processos
+    # de trabalho e do índice em disco como cópias: sys.intern guarda uma única string de cada
+    if kind == 'entity':
+        results.entity_classes[filepath] = [sys.intern(p) for p in data]
+    elif kind == 'business':
+        results.business_components[filepath] = [sys.intern(p) for p in data]
+    elif kind == 'jsf':
+        results.jsf_pages.append(filepath)
+    elif kind == 'ast':
+        for metrics in data:
+            metrics.business_method_names = [sys.intern(name) for name in metrics.business_method_names]
+        results.class_metrics.extend(data)
+    elif kind == 'db':
+        results.db_info_list.append(data)
+    elif kind == 'error':
+        results.log.append(data)
+
+def capture_database_info(results):
+    """Consolida as informações de DB encontradas durante a varredura do projeto."""
+    if results.db_info_list:
+        results.db_info = "### Arquivos de Configuração de Banco de Dados Encontrados\n" + "\n".join(results.db_info_list)
     else:
-        db_info_placeholder = "Não foram encontrados arquivos de configuração de DB comuns (.properties, .xml, .yml)."
+        results.db_info = "Não foram encontrados arquivos de configuração de DB comuns (.properties, .xml, .yml)."
 
-def run_analysis(project_root):
-    """Percorre a pasta do projeto e chama as funções de análise."""
-    global analysis_log, business_rules_metrics
+def scan_project(project_root, results):
+    """
+    Percorre o projeto uma única vez, despachando cada arquivo pela extensão.
+    Em projetos grandes, os arquivos .java (regex + AST) são distribuídos em lotes entre os
+    núcleos disponíveis, enquanto o processo principal varre os arquivos de configuração.
+    """
+    output_root = os.path.join(project_root, OUTPUT_FOLDER)
+    ast_cache_dir = os.path.join(output_root, AST_CACHE_FOLDER)
+    classify_cache_file = os.path.join(output_root, CLASSIFY_CACHE_FILE)
+    classify_cache = load_classify_cache(classify_cache_file)
+
+    java_paths = []  # Todos os .java, na ordem da varredura
+    java_signatures = {}  # caminho -> [mtime_ns, tamanho]
+    java_found = {}  # caminho -> resultados, vindos do índice ou da análise
+    java_files = []  # .java que precisam ser lidos
+    config_files = []
+    for entry, kind in _iter_files(project_root, FILE_KIND_BY_EXT):
+        file = entry.name
+        if kind == 'java':
+            try:
+                st = entry.stat()
+                signature = [st.st_mtime_ns, st.st_size]
+            except OSError:
+                signature = None
+            java_paths.append(entry.path)
+            java_signatures[entry.path] = signature
+            found = restore_cached_java_file(entry.path, classify_cache.get(entry.path), signature, ast_cache_dir)
+            if found is None:
+                java_files.append((entry.path, file))
+            else:
+                java_found[entry.path] = found
+        elif kind == 'jsf':
+            record_result(analyze_jsf_file(entry.path), results)
+        else:
+            try:
+                size = entry.stat().st_size
+            except OSError:
+                continue
+            if 0 < size <= CONFIG_MAX_SIZE:
+                config_files.append((entry.path, file))
+
+    analyze_batch = functools.partial(analyze_file_batch, ast_cache_dir=ast_cache_dir)
+    if len(java_files) < PARALLEL_MIN_FILES:
+        batch_results = [analyze_batch(java_files), analyze_batch(config_files)]
+    else:
+        batches = [java_files[i:i + PARALLEL_BATCH_SIZE] for i in range(0, len(java_files), PARALLEL_BATCH_SIZE)]
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            # map submete todos os lotes de imediato e preserva a ordem, mantendo os relatórios na ordem da varredura
+            java_results = executor.map(analyze_batch, batches)
+            # A leitura dos arquivos de configuração (limitada por E/S) ocorre enquanto os processos fazem o parsing
+            config_results = analyze_batch(config_files)
+            batch_results = [*java_results, config_results]
+
+    *java_results, config_results = batch_results
+    for batch in java_results:
+        for result in batch:
+            java_found.setdefault(result[1], []).append(result)
+
+    # Registra na ordem da varredura, venha o resultado do índice ou da análise
+    classify_entries = {}
+    for filepath in java_paths:
+        for result in java_found.get(filepath, ()):
+            if result[0] == 'cache':
+                if java_signatures[filepath] is not None:
+                    classify_entries[filepath] = java_signatures[filepath] + result[2]
+            else:
+                record_result(result, results)
+    for result in config_results:
+        record_result(result, results)
+    save_classify_cache(classify_cache_file, classify_entries)
+    prune_ast_cache(ast_cache_dir, {entry[4] for entry in classify_entries.values() if entry[4] is not None})
 
-    analysis_log += f"Iniciando análise do projeto em: {project_root}\n"
-    analysis_log += f"Hora de início: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+def run_analysis(project_root):
+    """Percorre a pasta do projeto, chama as funções de análise e retorna os resultados."""
+    results = AnalysisResults()
 
-    capture_database_info(project_root)
+    results.log.append(f"Iniciando análise do projeto em: {project_root}\n")
+    results.log.append(f"Hora de início: {RUN_TIMESTAMP}\n")
 
-    for root, _, files in os.walk(project_root):
-        for file in files:
-            filepath = os.path.join(root, file)
-            if file.endswith(JAVA_FILE_EXT):
-                analyze_java_file(filepath)
-            elif any(file.endswith(ext) for ext in JSF_FILE_EXT):
-                analyze_jsf_file(filepath)
+    scan_project(project_root, results)
+    capture_database_info(results)
 
-    analysis_log += "Análise de Arquivos Concluída.\n"
+    results.log.append("Análise de Arquivos Concluída.\n")
     
     # Realizar análise de regras de negócio com AST
-    if HAS_JAVALANG:
-        analysis_log += "Iniciando análise de regras de negócio (AST)...\n"
-        business_rules_metrics = analyze_business_rules(project_root)
-        if business_rules_metrics:
-            analysis_log += f"  - Classes analisadas: {business_rules_metrics.get('total_classes', 0)}\n"
-            analysis_log += f"  - Controllers encontrados: {business_rules_metrics.get('total_controllers', 0)}\n"
-            analysis_log += f"  - Services encontrados: {business_rules_metrics.get('total_services', 0)}\n"
-            analysis_log += f"  - Métodos com regras de negócio: {business_rules_metrics.get('total_business_methods', 0)}\n"
-            if business_rules_metrics.get('total_controllers', 0) > 0:
-                analysis_log += f"  - Média de métodos por Controller: {business_rules_metrics.get('avg_business_methods_per_controller', 0):.2f}\n"
-        analysis_log += "Análise de regras de negócio concluída.\n"
+    if HAS_AST_BACKEND:
+        results.log.append(f"Iniciando análise de regras de negócio (AST, parser {AST_BACKEND})...\n")
+        metrics = analyze_business_rules(results.class_metrics)
+        results.business_rules_metrics = metrics
+        if metrics:
+            results.log.append(f"  - Classes analisadas: {metrics.get('total_classes', 0)}\n")
+            results.log.append(f"  - Controllers encontrados: {metrics.get('total_controllers', 0)}\n")
+            results.log.append(f"  - Services encontrados: {metrics.get('total_services', 0)}\n")
+            results.log.append(f"  - Métodos com regras de negócio: {metrics.get('total_business_methods', 0)}\n")
+            if metrics.get('total_controllers', 0) > 0:
+                results.log.append(f"  - Média de métodos por Controller: {metrics.get('avg_business_methods_per_controller', 0):.2f}\n")
+        results.log.append("Análise de regras de negócio concluída.\n")
     else:
-        analysis_log += "⚠️  javalang não está disponível. Pulando análise de regras de negócio.\n"
+        results.log.append("⚠️  Nenhum parser Java (javalang ou tree-sitter) está disponível. Pulando análise de regras de negócio.\n")
+
+    results.rel_paths = build_rel_paths(results)
+    results.entity_labels = join_labels(results.entity_classes)
+    results.component_labels = join_labels(results.business_components)
+    return results
+
+def estimate_body_size(value, limit: int = BODY_SIZE_LIMIT, in_container: bool = False) -> int:
+    """
+    Calcula len(str(value)) de um nó/lista da AST do javalang sem montar a string,
+    interrompendo assim que o tamanho passa de `limit` (o valor retornado é então apenas > limit).
+    Segue o __repr__ dos nós: atributos em ordem alfabética como nome=str(valor),
+    e itens de listas via repr.
+    """
+    if isinstance(value, javalang.ast.Node):
+        size = len(type(value).__name__) + 2
+        for i, attr in enumerate(sorted(value.attrs)):
+            size += len(attr) + (3 if i else 1)  # ", " entre atributos e "="
+            size += estimate_body_size(getattr(value, attr), limit - size)
+            if size > limit:
+                return size
+        return size
+    if isinstance(value, list):
+        size = 2 + 2 * max(len(value) - 1, 0)  # colchetes e ", " entre itens
+        for item in value:
+            size += estimate_body_size(item, limit - size, in_container=True)
+            if size > limit:
+                return size
+        return size
+    return len(repr(value) if in_container else str(value))
 
 def has_business_logic_in_method(method_node) -> bool:
     """
@@ -172,7 +624,6 @@ def has_business_logic_in_method(method_node) -> bool:
         # Iterar pelos statements no corpo do método
         var_declarations = 0
         return_statements = 0
-        body_size = len(str(method_node.body))
         
         for statement in method_node.body:
             # Verificar diferentes tipos de statements como indicadores de lógica de negócio
@@ -195,13 +646,17 @@ def has_business_logic_in_method(method_node) -> bool:
             if isinstance(statement, javalang.tree.ReturnStatement):
                 return_statements += 1
         
-        # Heurística: Se tem várias variáveis locais + return + tamanho significativo = lógica de negócio
+        # Heurística: Se tem várias variáveis locais + return = lógica de negócio
         has_multiple_vars = var_declarations >= 3
         has_return = return_statements > 0
-        has_significant_size = body_size > 1000  # 1KB+
+        if has_multiple_vars and has_return:
+            return True
+        
+        # Só quando as verificações baratas não decidem o tamanho do corpo é estimado
+        body_size = estimate_body_size(method_node.body)
         
-        # Se tem múltiplas variáveis OU tamanho grande, é lógica de negócio
-        if (has_multiple_vars and has_return) or has_significant_size:
+        # Tamanho grande, por si só, indica lógica de negócio
+        if body_size > BODY_SIZE_LIMIT:  # 1KB+
             return True
         
         # Se tem pelo menos 2 variáveis + retorno + código de tamanho médio
@@ -211,14 +666,13 @@ def has_business_logic_in_method(method_node) -> bool:
         return False
         
     except Exception:
-        # Se houver erro ao processar AST, tenta fallback com string
+        # Se houver erro ao processar a AST, o método não é contado
         return False
 
 
 def is_business_rule_method(method_node) -> bool:
     """
-    Detecta se um método contém lógica de regra de negócio.
-    Tenta análise AST primeiro, depois fallback para regex.
+    Detecta se um método contém lógica de regra de negócio, analisando a AST do javalang.
     """
     if not hasattr(method_node, 'body') or method_node.body is None:
         return False
@@ -227,60 +681,90 @@ def is_business_rule_method(method_node) -> bool:
     if any(method_node.name.startswith(prefix) for prefix in ['get', 'set', 'is']):
         return False
     
-    # Tentar análise AST se javalang está disponível
-    if HAS_JAVALANG:
-        try:
-            if has_business_logic_in_method(method_node):
+    return has_business_logic_in_method(method_node)
+
+
+def iter_type_declarations(tree):
+    """
+    Gera as declarações de tipo (classes, interfaces, enums) da AST em pré-ordem, como
+    tree.filter(TypeDeclaration), mas percorrendo a árvore uma única vez com pilha explícita:
+    sem a cadeia de geradores recursivos nem a tupla de ancestrais montada para cada nó.
+    """
+    node_type = javalang.ast.Node
+    type_declaration = javalang.tree.TypeDeclaration
+    walkable = (node_type, list, tuple)
+    stack = [tree]
+    pop, push = stack.pop, stack.append
+    while stack:
+        node = pop()
+        # Filhos empilhados em ordem reversa para que o primeiro seja visitado primeiro
+        if isinstance(node, node_type):
+            if isinstance(node, type_declaration):
+                yield node
+            # Equivalente a node.children, sem criar a lista intermediária
+            for attr in reversed(node.attrs):
+                child = getattr(node, attr)
+                if isinstance(child, walkable):
+                    push(child)
+        else:
+            for child in reversed(node):
+                if isinstance(child, walkable):
+                    push(child)
+
+def may_declare_public_method(tokens) -> bool:
+    """
+    Indica, apenas pelos tokens, se o arquivo pode declarar algum método público.
+    Cada modificador `public` é seguido até o primeiro `(` (método ou construtor), `;`/`=` (campo)
+    ou palavra-chave de declaração de tipo. Na dúvida, considera que sim.
+    """
+    count = len(tokens)
+    for i, token in enumerate(tokens):
+        if token.value != 'public':
+            continue
+        for j in range(i + 1, count):
+            value = tokens[j].value
+            if value == '(':
                 return True
-        except Exception:
-            pass  # Fallback para método de string
-    
-    # Fallback: análise de string
-    method_body = str(method_node.body)
-    lines_of_code = len([line for line in method_body.split('\n') if line.strip() and not line.strip().startswith('//')])
-    
-    # Métodos muito curtos são provavelmente simples
-    if lines_of_code < 2:
-        return False
-    
-    # Padrões que indicam regras de negócio
-    business_patterns = [
-        r'\bif\b', r'\belse\b', r'\bswitch\b', r'\bcase\b',      # Condicionais
-        r'\bfor\b', r'\bwhile\b', r'\bdo\b',                      # Loops
-        r'query\(', r'execute\(', r'save\(', r'delete\(',         # Operações de BD
-        r'\.add\(', r'\.remove\(', r'\.set\(', r'\.put\(',        # Modificações de estado
-        r'throw\s+', r'catch\s*\(',                                # Exceções
-        r'return\s+[^;]*[\+\-\*/%]',                               # Cálculos no retorno
-        r'\.compareTo\(', r'\.equals\(', r'\.contains\(',         # Comparações
-    ]
-    
-    for pattern in business_patterns:
-        if re.search(pattern, method_body):
+            if value in (';', '=', 'class', 'interface', 'enum'):
+                break
+        else:
             return True
-    
     return False
 
-
-def analyze_java_file_ast(file_path: str) -> Optional[List[BusinessRuleMetrics]]:
+def class_type_from_name(class_name: str) -> str:
+    """Determina o tipo da classe (Controller, Service, Repository, etc.) pelo nome."""
+    if 'Controller' in class_name:
+        return "Controller"
+    if 'Service' in class_name:
+        return "Service"
+    if 'Repository' in class_name:
+        return "Repository"
+    if 'Impl' in class_name:
+        return "Implementation"
+    return "Class"
+
+def analyze_java_file_ast(file_path: str, content: str) -> Optional[List[BusinessRuleMetrics]]:
     """
-    Analisa um arquivo Java usando AST e extrai métricas de regras de negócio.
+    Analisa o conteúdo já lido de um arquivo Java usando AST e extrai métricas de regras de negócio.
     Retorna lista de BusinessRuleMetrics para cada classe/interface encontrada.
     """
     if not HAS_JAVALANG:
         return None
     
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-        
         if not content.strip():
             return None
         
-        tree = javalang.parse.parse(content)
+        # Os tokens são reaproveitados pelo parser; sem método público possível (ex.: interfaces de
+        # repositório, enums, classes de constantes) nenhuma métrica seria gerada e o parsing é evitado
+        tokens = list(javalang.tokenizer.tokenize(content))
+        if not may_declare_public_method(tokens):
+            return None
+        tree = javalang.parser.Parser(tokens).parse()
         metrics_list = []
         
         # Iterar sobre tipos (classes, interfaces) declarados no arquivo
-        for _, type_decl in tree.filter(javalang.tree.TypeDeclaration):
+        for type_decl in iter_type_declarations(tree):
             class_name = type_decl.name
             
             # Contar métodos e identificar métodos com regras de negócio
@@ -299,16 +783,7 @@ def analyze_java_file_ast(file_path: str) -> Optional[List[BusinessRuleMetrics]]
                         business_method_names.append(method.name)
             
             # Determinar tipo (Controller, Service, Repository, etc.)
-            class_type = "Class"
-            if hasattr(type_decl, 'name'):
-                if 'Controller' in class_name:
-                    class_type = "Controller"
-                elif 'Service' in class_name:
-                    class_type = "Service"
-                elif 'Repository' in class_name:
-                    class_type = "Repository"
-                elif 'Impl' in class_name:
-                    class_type = "Implementation"
+            class_type = class_type_from_name(class_name)
             
             if public_methods > 0:  # Apenas incluir classes com métodos públicos
                 metrics = BusinessRuleMetrics(
@@ -328,28 +803,211 @@ def analyze_java_file_ast(file_path: str) -> Optional[List[BusinessRuleMetrics]]
         return None
 
 
-def analyze_business_rules(project_path: str) -> Dict[str, any]:
+# --- Backend tree-sitter ---
+# Tipos de nó equivalentes aos usados pela análise com javalang
+TS_TYPE_DECLARATIONS = frozenset({
+    'class_declaration', 'interface_declaration', 'enum_declaration',
+    'annotation_type_declaration', 'record_declaration',
+})
+# Statements de controle e exceções = lógica de negócio
+TS_BUSINESS_STATEMENTS = frozenset({
+    'if_statement', 'while_statement', 'for_statement', 'enhanced_for_statement', 'do_statement',
+    'switch_expression', 'try_statement', 'try_with_resources_statement', 'throw_statement',
+})
+
+def ts_iter_type_declarations(root):
+    """Gera as declarações de tipo da árvore do tree-sitter em pré-ordem, como iter_type_declarations."""
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if node.type in TS_TYPE_DECLARATIONS:
+            yield node
+        stack.extend(reversed(node.named_children))
+
+def ts_type_methods(type_node):
+    """Métodos declarados diretamente no corpo do tipo (em enums, após as constantes)."""
+    body = type_node.child_by_field_name('body')
+    if body is None:
+        return []
+    members = body.named_children
+    if body.type == 'enum_body':
+        members = [m for decls in members if decls.type == 'enum_body_declarations' for m in decls.named_children]
+    return [m for m in members if m.type == 'method_declaration']
+
+def ts_is_public(method_node) -> bool:
+    """Indica se o método tem o modificador public."""
+    for child in method_node.children:
+        if child.type == 'modifiers':
+            return any(modifier.type == 'public' for modifier in child.children)
+    return False
+
+def ts_has_business_logic(method_node, method_name: str) -> bool:
+    """
+    Mesma heurística de has_business_logic_in_method sobre a árvore do tree-sitter.
+    O tamanho do corpo é medido no código-fonte, e não na representação da AST do javalang
+    (bem mais longa): métodos que só se qualificam pelas regras de tamanho divergem.
+    """
+    # Ignorar getters/setters/isXxx
+    if method_name.startswith(('get', 'set', 'is')):
+        return False
+    body = method_node.child_by_field_name('body')
+    if body is None:
+        return False
+
+    var_declarations = 0
+    return_statements = 0
+    has_statements = False
+    for statement in body.named_children:
+        if statement.is_extra:  # Comentários
+            continue
+        has_statements = True
+        # `rotulo: for (...)` vem embrulhado em labeled_statement; no javalang o rótulo é só
+        # um atributo do próprio laço
+        while statement.type == 'labeled_statement':
+            statement = statement.named_children[-1]
+        statement_type = statement.type
+        if statement_type in TS_BUSINESS_STATEMENTS:
+            return True
+        if statement_type == 'local_variable_declaration':
+            var_declarations += 1
+        elif statement_type == 'return_statement':
+            return_statements += 1
+    if not has_statements:
+        return False
+
+    has_return = return_statements > 0
+    if var_declarations >= 3 and has_return:
+        return True
+    body_size = body.end_byte - body.start_byte
+    if body_size > BODY_SIZE_LIMIT:
+        return True
+    return var_declarations >= 2 and has_return and body_size > 500
+
+def analyze_java_file_tree_sitter(file_path: str, content: bytes) -> Optional[List[BusinessRuleMetrics]]:
+    """
+    Equivalente a analyze_java_file_ast usando o parser em C do tree-sitter.
+    Arquivos com erro de sintaxe são ignorados, como acontece com o javalang.
+    """
+    try:
+        tree = TS_JAVA_PARSER.parse(content)
+        if tree.root_node.has_error:
+            return None
+        metrics_list = []
+        for type_node in ts_iter_type_declarations(tree.root_node):
+            class_name = type_node.child_by_field_name('name').text.decode('utf-8', errors='ignore')
+            public_methods = 0
+            business_method_names = []
+            for method in ts_type_methods(type_node):
+                if ts_is_public(method):
+                    public_methods += 1
+                    method_name = method.child_by_field_name('name').text.decode('utf-8', errors='ignore')
+                    if ts_has_business_logic(method, method_name):
+                        business_method_names.append(method_name)
+            if public_methods > 0:  # Apenas incluir classes com métodos públicos
+                metrics_list.append(BusinessRuleMetrics(
+                    class_name=class_name,
+                    file_path=file_path,
+                    controller_type=class_type_from_name(class_name),
+                    public_methods=public_methods,
+                    business_methods=len(business_method_names),
+                    business_method_names=business_method_names
+                ))
+        return metrics_list if metrics_list else None
+    except Exception:
+        return None
+
+
+def ast_cache_key(content) -> str:
+    """
+    Chave do cache das métricas AST para o conteúdo informado.
+    Inclui o parser (com versão) e a versão do cache, invalidando entradas de versões anteriores.
+    """
+    digest = hashlib.sha256(f"{AST_BACKEND}:{AST_CACHE_VERSION}:".encode())
+    digest.update(content)
+    return digest.hexdigest()
+
+def ast_cache_path(cache_dir: str, key: str) -> str:
+    """Caminho do arquivo de cache para a chave informada."""
+    return os.path.join(cache_dir, key[:2], f"{key}.json")
+
+def prune_ast_cache(cache_dir: str, used_keys) -> None:
+    """
+    Remove do cache as entradas não usadas nesta execução (arquivos alterados ou apagados),
+    como save_classify_cache faz com o índice; sem isso o cache cresce a cada edição.
+    """
+    try:
+        subdirs = list(os.scandir(cache_dir))
+    except OSError:
+        return
+    for subdir in subdirs:
+        if not subdir.is_dir(follow_symlinks=False):
+            continue
+        try:
+            with os.scandir(subdir.path) as it:
+                stale = [entry.path for entry in it if entry.name.partition('.')[0] not in used_keys
+                         or not entry.name.endswith('.json')]
+            for path in stale:
+                os.remove(path)
+            if stale:
+                os.rmdir(subdir.path)  # Falha (e é ignorado) se ainda houver entradas
+        except OSError:
+            pass
+
+def load_cached_metrics(cache_file: str, file_path: str) -> Optional[List[BusinessRuleMetrics]]:
+    """Carrega as métricas em cache; exceções indicam entrada ausente ou ilegível."""
+    # JSON e não pickle: o cache fica dentro do projeto analisado, e um repositório poderia
+    # trazer entradas forjadas (as chaves são calculáveis a partir do conteúdo)
+    with open(cache_file, 'r', encoding='utf-8') as f:
+        cached = json.load(f)
+    if not cached:
+        return None
+    # O mesmo conteúdo pode estar em outro caminho: o cache guarda só as métricas
+    metrics_list = [BusinessRuleMetrics(**dict(fields, file_path=file_path)) for fields in cached]
+    # Entrada adulterada conta como ilegível (e o arquivo é analisado de novo)
+    for m in metrics_list:
+        if not (isinstance(m.class_name, str) and isinstance(m.controller_type, str)
+                and type(m.public_methods) is int and type(m.business_methods) is int
+                and isinstance(m.business_method_names, list)
+                and all(isinstance(name, str) for name in m.business_method_names)):
+            raise ValueError(f"entrada de cache inválida: {cache_file}")
+    return metrics_list
+
+def analyze_java_content_ast(file_path: str, content, cache_file: Optional[str] = None) -> Optional[List[BusinessRuleMetrics]]:
+    """
+    Executa a análise AST (javalang ou, na falta dele, tree-sitter) sobre o conteúdo binário do arquivo, reaproveitando
+    as métricas em cache quando o mesmo conteúdo já foi analisado em uma execução anterior.
+    """
+    if cache_file:
+        try:
+            return load_cached_metrics(cache_file, file_path)
+        except Exception:
+            pass  # Ausente ou ilegível: analisa novamente
+
+    # content[:] não copia bytes; no mmap, materializa o arquivo
+    if HAS_JAVALANG:
+        metrics_list = analyze_java_file_ast(file_path, content[:].decode('utf-8', errors='ignore'))
+    else:
+        metrics_list = analyze_java_file_tree_sitter(file_path, content[:])
+
+    if cache_file:
+        # Campos em dicionários simples: o cache não depende do módulo onde a classe foi definida
+        write_json_atomic(cache_file, [asdict(m) for m in metrics_list or ()])
+    return metrics_list
+
+
+def analyze_business_rules(all_metrics: List[BusinessRuleMetrics]) -> Dict[str, any]:
     """
-    Analisa o projeto inteiro para regras de negócio e retorna métricas agregadas.
+    Agrega as métricas por classe coletadas na varredura do projeto.
     """
-    all_metrics = []
     controllers = []
     services = []
     
-    # Procurar por arquivos Java
-    for root, dirs, files in os.walk(project_path):
-        for file in files:
-            if file.endswith('.java'):
-                file_path = os.path.join(root, file)
-                metrics = analyze_java_file_ast(file_path)
-                
-                if metrics:
-                    for metric in metrics:
-                        all_metrics.append(metric)
-                        if 'Controller' in metric.controller_type:
-                            controllers.append(metric)
-                        elif 'Service' in metric.controller_type:
-                            services.append(metric)
+    for metric in all_metrics:
+        metric.business_method_label = ', '.join(metric.business_method_names)
+        if 'Controller' in metric.controller_type:
+            controllers.append(metric)
+        elif 'Service' in metric.controller_type:
+            services.append(metric)
     
     # Calcular estatísticas
     avg_business_methods_per_controller = 0
@@ -380,6 +1038,31 @@ def analyze_business_rules(project_path: str) -> Dict[str, any]:
     }
 
 
+def make_relpath():
+    """
+    Cria uma função que converte caminhos do projeto em caminhos relativos.
+    Caminhos dentro de PROJECT_PATH são resolvidos cortando o prefixo; os demais usam os.path.relpath.
+    """
+    base = os.path.join(os.path.abspath(PROJECT_PATH), '')
+    base_len = len(base)
+
+    def relpath(path):
+        if path.startswith(base):
+            return path[base_len:]
+        return os.path.relpath(path, PROJECT_PATH)
+    return relpath
+
+def build_rel_paths(results):
+    """Resolve uma única vez o caminho relativo de cada arquivo citado nos relatórios."""
+    relpath = make_relpath()
+    paths = itertools.chain(results.entity_classes, results.business_components, results.jsf_pages,
+                            (m.file_path for m in results.class_metrics))
+    return {path: relpath(path) for path in paths}
+
+def join_labels(patterns_by_file):
+    """Une uma única vez os padrões de cada arquivo no texto exibido pelos relatórios."""
+    return {path: ', '.join(patterns) for path, patterns in patterns_by_file.items()}
+
 def create_output_folder(project_path):
     """Cria a pasta de saída dentro do projeto se não existir."""
     output_path = os.path.join(project_path, OUTPUT_FOLDER)
@@ -388,240 +1071,125 @@ def create_output_folder(project_path):
         print(f"📁 Pasta '{output_path}' criada com sucesso.")
     return output_path
 
-def generate_excel_report(folder_name, output_path):
-    """Gera um relatório em formato Excel (.xlsx)."""
+def excel_table_sheets(results, relpath):
+    """Planilhas tabulares do relatório Excel como (nome, índice, larguras, cabeçalhos, linhas)."""
+    pattern_headers = ["File Path", "Relative Path", "Patterns Found"]
+    return [
+        ("Entity Classes", 1, (50, 40, 35), pattern_headers,
+         ((fp, relpath(fp), label) for fp, label in results.entity_labels.items())),
+        ("Business Components", 2, (50, 40, 35), pattern_headers,
+         ((fp, relpath(fp), label) for fp, label in results.component_labels.items())),
+        ("JSF Pages", 3, (50, 40), ["File Path", "Relative Path"],
+         ((fp, relpath(fp)) for fp in results.jsf_pages)),
+    ]
+
+BUSINESS_RULES_SHEET = ("Business Rules Analysis", 4, (25, 40, 15, 15, 20, 35))
+BUSINESS_RULES_HEADERS = ["Class Name", "File", "Type", "Public Methods", "Business Rule Methods", "Business Method Names"]
+
+def business_rules_rows(metrics, relpath):
+    """Linhas da planilha de regras de negócio, uma por classe analisada."""
+    return ((m.class_name, relpath(m.file_path), m.controller_type, m.public_methods, m.business_methods,
+             m.business_method_label)
+            for m in metrics.get('all_metrics', []))
+
+def business_rules_summary(metrics):
+    """Linhas de resumo estatístico exibidas abaixo da tabela de regras de negócio."""
+    return [
+        ("Total Classes Analyzed:", metrics.get('total_classes', 0)),
+        ("Total Controllers:", metrics.get('total_controllers', 0)),
+        ("Total Services:", metrics.get('total_services', 0)),
+        ("Total Business Rule Methods:", metrics.get('total_business_methods', 0)),
+        ("Avg Business Methods per Controller:", f"{metrics.get('avg_business_methods_per_controller', 0):.2f}"),
+        ("Avg Business Methods per Service:", f"{metrics.get('avg_business_methods_per_service', 0):.2f}"),
+    ]
+
+def register_excel_styles(wb):
+    """Registra no workbook os estilos nomeados usados pelo relatório."""
+    for name, attrs in EXCEL_NAMED_STYLES.items():
+        # Atributos não informados herdam os padrões do workbook (NamedStyle criaria fonte/borda vazias)
+        attrs = {'font': DEFAULT_FONT, 'border': DEFAULT_BORDER, **attrs}
+        wb.add_named_style(NamedStyle(name=name, **attrs))
+
+def excel_cell(ws, value, style):
+    """Cria uma célula write-only; nesse modo o estilo só pode ser definido na criação da célula."""
+    c = WriteOnlyCell(ws, value=value)
+    c.style = style
+    return c
+
+def create_excel_sheet(wb, name, index, widths, title=None):
+    """Cria uma planilha com as larguras de coluna informadas e a linha de título mesclada."""
+    ws = wb.create_sheet(name, index)
+    for col, width in enumerate(widths, start=1):
+        ws.column_dimensions[get_column_letter(col)].width = width
+    ws.merged_cells.add(f"A1:{get_column_letter(len(widths))}1")
+    ws.append([excel_cell(ws, title or name, 'rnc_title')])
+    ws.append([])
+    return ws
+
+def write_excel_rows(ws, headers, rows, header_border=True):
+    """Grava a linha de cabeçalho e, em seguida, uma linha por item de `rows`, todas no mesmo laço."""
+    header_style = 'rnc_header' if header_border else 'rnc_header_plain'
+    ws.append([excel_cell(ws, h, header_style) for h in headers])
+    # No modo write-only cada linha é serializada dentro do append: as mesmas células
+    # (já com estilo) são reaproveitadas em todas as linhas, trocando apenas o valor
+    cells = [excel_cell(ws, None, 'rnc_body') for _ in headers]
+    for row in rows:
+        for cell, value in zip(cells, row):
+            cell.value = value
+        ws.append(cells)
+
+def generate_excel_report(folder_name, output_path, results):
+    """
+    Gera um relatório em formato Excel (.xlsx).
+    Usa xlsxwriter quando instalado (mais rápido em projetos grandes); caso contrário, openpyxl.
+    """
+    if HAS_XLSXWRITER:
+        return generate_excel_report_xlsxwriter(folder_name, output_path, results)
     if not HAS_OPENPYXL:
         print("⚠️  openpyxl não está instalado. Pulando geração de Excel.")
         return None
 
     try:
-        wb = Workbook()
-        wb.remove(wb.active)  # Remove a sheet padrão
-        
-        # Estilos
-        header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF", size=12)
-        title_font = Font(bold=True, size=14, color="FFFFFF")
-        title_fill = PatternFill(start_color="203864", end_color="203864", fill_type="solid")
-        border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-        center_align = Alignment(horizontal="center", vertical="center", wrap_text=True)
-        left_align = Alignment(horizontal="left", vertical="top", wrap_text=True)
+        wb = Workbook(write_only=True)
+        register_excel_styles(wb)
+        relpath = results.rel_paths.__getitem__
 
         # Sheet 1: Summary
-        ws_summary = wb.create_sheet("Summary", 0)
-        ws_summary['A1'] = "RNC Project Discovery - Analysis Report"
-        ws_summary['A1'].font = title_font
-        ws_summary['A1'].fill = title_fill
-        ws_summary.merge_cells('A1:B1')
-        
-        ws_summary['A3'] = "Project Name:"
-        ws_summary['B3'] = folder_name
-        ws_summary['A4'] = "Analysis Date:"
-        ws_summary['B4'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        ws_summary['A5'] = "Project Path:"
-        ws_summary['B5'] = PROJECT_PATH
-        
-        ws_summary['A7'] = "Metric"
-        ws_summary['B7'] = "Count"
-        for cell in ['A7', 'B7']:
-            ws_summary[cell].font = header_font
-            ws_summary[cell].fill = header_fill
-            ws_summary[cell].alignment = center_align
-        
-        ws_summary['A8'] = "Entity Classes"
-        ws_summary['B8'] = len(entity_classes)
-        ws_summary['A9'] = "Business Components"
-        ws_summary['B9'] = len(business_components)
-        ws_summary['A10'] = "JSF Pages"
-        ws_summary['B10'] = len(jsf_pages)
-        
-        for row in range(8, 11):
-            ws_summary[f'A{row}'].alignment = left_align
-            ws_summary[f'B{row}'].alignment = center_align
-            ws_summary[f'B{row}'].font = Font(bold=True, size=11)
-
-        ws_summary.column_dimensions['A'].width = 25
-        ws_summary.column_dimensions['B'].width = 30
-
-        # Sheet 2: Entity Classes
-        ws_entities = wb.create_sheet("Entity Classes", 1)
-        ws_entities['A1'] = "Entity Classes"
-        ws_entities['A1'].font = title_font
-        ws_entities['A1'].fill = title_fill
-        ws_entities.merge_cells('A1:C1')
-        
-        ws_entities['A3'] = "File Path"
-        ws_entities['B3'] = "Relative Path"
-        ws_entities['C3'] = "Patterns Found"
-        for cell in ['A3', 'B3', 'C3']:
-            ws_entities[cell].font = header_font
-            ws_entities[cell].fill = header_fill
-            ws_entities[cell].alignment = center_align
-            ws_entities[cell].border = border
-
-        row = 4
-        for filepath, patterns in entity_classes.items():
-            relative_path = os.path.relpath(filepath, PROJECT_PATH)
-            patterns_str = ', '.join(patterns)
-            ws_entities[f'A{row}'] = filepath
-            ws_entities[f'B{row}'] = relative_path
-            ws_entities[f'C{row}'] = patterns_str
-            for col in ['A', 'B', 'C']:
-                ws_entities[f'{col}{row}'].alignment = left_align
-                ws_entities[f'{col}{row}'].border = border
-            row += 1
-
-        ws_entities.column_dimensions['A'].width = 50
-        ws_entities.column_dimensions['B'].width = 40
-        ws_entities.column_dimensions['C'].width = 35
-
-        # Sheet 3: Business Components
-        ws_business = wb.create_sheet("Business Components", 2)
-        ws_business['A1'] = "Business Components"
-        ws_business['A1'].font = title_font
-        ws_business['A1'].fill = title_fill
-        ws_business.merge_cells('A1:C1')
-        
-        ws_business['A3'] = "File Path"
-        ws_business['B3'] = "Relative Path"
-        ws_business['C3'] = "Patterns Found"
-        for cell in ['A3', 'B3', 'C3']:
-            ws_business[cell].font = header_font
-            ws_business[cell].fill = header_fill
-            ws_business[cell].alignment = center_align
-            ws_business[cell].border = border
-
-        row = 4
-        for filepath, patterns in business_components.items():
-            relative_path = os.path.relpath(filepath, PROJECT_PATH)
-            patterns_str = ', '.join(patterns)
-            ws_business[f'A{row}'] = filepath
-            ws_business[f'B{row}'] = relative_path
-            ws_business[f'C{row}'] = patterns_str
-            for col in ['A', 'B', 'C']:
-                ws_business[f'{col}{row}'].alignment = left_align
-                ws_business[f'{col}{row}'].border = border
-            row += 1
-
-        ws_business.column_dimensions['A'].width = 50
-        ws_business.column_dimensions['B'].width = 40
-        ws_business.column_dimensions['C'].width = 35
-
-        # Sheet 4: JSF Pages
-        ws_jsf = wb.create_sheet("JSF Pages", 3)
-        ws_jsf['A1'] = "JSF Pages"
-        ws_jsf['A1'].font = title_font
-        ws_jsf['A1'].fill = title_fill
-        ws_jsf.merge_cells('A1:B1')
-        
-        ws_jsf['A3'] = "File Path"
-        ws_jsf['B3'] = "Relative Path"
-        for cell in ['A3', 'B3']:
-            ws_jsf[cell].font = header_font
-            ws_jsf[cell].fill = header_fill
-            ws_jsf[cell].alignment = center_align
-            ws_jsf[cell].border = border
-
-        row = 4
-        for filepath in jsf_pages:
-            relative_path = os.path.relpath(filepath, PROJECT_PATH)
-            ws_jsf[f'A{row}'] = filepath
-            ws_jsf[f'B{row}'] = relative_path
-            for col in ['A', 'B']:
-                ws_jsf[f'{col}{row}'].alignment = left_align
-                ws_jsf[f'{col}{row}'].border = border
-            row += 1
-
-        ws_jsf.column_dimensions['A'].width = 50
-        ws_jsf.column_dimensions['B'].width = 40
+        ws_summary = create_excel_sheet(wb, "Summary", 0, (25, 30), title="RNC Project Discovery - Analysis Report")
+        ws_summary.append(["Project Name:", folder_name])
+        ws_summary.append(["Analysis Date:", RUN_TIMESTAMP])
+        ws_summary.append(["Project Path:", PROJECT_PATH])
+        ws_summary.append([])
+        write_excel_rows(ws_summary, ["Metric", "Count"], [], header_border=False)
+        for label, count in (("Entity Classes", len(results.entity_classes)),
+                             ("Business Components", len(results.business_components)),
+                             ("JSF Pages", len(results.jsf_pages))):
+            ws_summary.append([excel_cell(ws_summary, label, 'rnc_text'),
+                               excel_cell(ws_summary, count, 'rnc_count')])
+
+        # Sheets 2-4: Entity Classes, Business Components, JSF Pages
+        for name, index, widths, headers, rows in excel_table_sheets(results, relpath):
+            write_excel_rows(create_excel_sheet(wb, name, index, widths), headers, rows)
 
         # Sheet 5: Business Rules Analysis
-        ws_rules = wb.create_sheet("Business Rules Analysis", 4)
-        ws_rules['A1'] = "Business Rules Analysis"
-        ws_rules['A1'].font = title_font
-        ws_rules['A1'].fill = title_fill
-        ws_rules.merge_cells('A1:F1')
-        
-        if business_rules_metrics and HAS_JAVALANG:
-            # Headers
-            headers = ["Class Name", "File", "Type", "Public Methods", "Business Rule Methods", "Business Method Names"]
-            for col, header in enumerate(headers, start=1):
-                cell = ws_rules.cell(row=3, column=col)
-                cell.value = header
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = center_align
-                cell.border = border
-            
-            # Dados das classes
-            row = 4
-            all_metrics = business_rules_metrics.get('all_metrics', [])
-            for metric in all_metrics:
-                ws_rules[f'A{row}'] = metric.class_name
-                ws_rules[f'B{row}'] = os.path.relpath(metric.file_path, PROJECT_PATH)
-                ws_rules[f'C{row}'] = metric.controller_type
-                ws_rules[f'D{row}'] = metric.public_methods
-                ws_rules[f'E{row}'] = metric.business_methods
-                ws_rules[f'F{row}'] = ', '.join(metric.business_method_names) if metric.business_method_names else ""
-                
-                for col in ['A', 'B', 'C', 'D', 'E', 'F']:
-                    ws_rules[f'{col}{row}'].alignment = left_align
-                    ws_rules[f'{col}{row}'].border = border
-                row += 1
-            
+        ws_rules = create_excel_sheet(wb, *BUSINESS_RULES_SHEET)
+        metrics = results.business_rules_metrics
+
+        if metrics and HAS_AST_BACKEND:
+            write_excel_rows(ws_rules, BUSINESS_RULES_HEADERS, business_rules_rows(metrics, relpath))
+
             # Resumo de estatísticas
-            summary_row = row + 2
-            ws_rules[f'A{summary_row}'] = "Summary Statistics"
-            ws_rules[f'A{summary_row}'].font = Font(bold=True, size=11)
-            
-            summary_row += 1
-            ws_rules[f'A{summary_row}'] = "Total Classes Analyzed:"
-            ws_rules[f'B{summary_row}'] = business_rules_metrics.get('total_classes', 0)
-            
-            summary_row += 1
-            ws_rules[f'A{summary_row}'] = "Total Controllers:"
-            ws_rules[f'B{summary_row}'] = business_rules_metrics.get('total_controllers', 0)
-            
-            summary_row += 1
-            ws_rules[f'A{summary_row}'] = "Total Services:"
-            ws_rules[f'B{summary_row}'] = business_rules_metrics.get('total_services', 0)
-            
-            summary_row += 1
-            ws_rules[f'A{summary_row}'] = "Total Business Rule Methods:"
-            ws_rules[f'B{summary_row}'] = business_rules_metrics.get('total_business_methods', 0)
-            
-            summary_row += 1
-            ws_rules[f'A{summary_row}'] = "Avg Business Methods per Controller:"
-            ws_rules[f'B{summary_row}'] = f"{business_rules_metrics.get('avg_business_methods_per_controller', 0):.2f}"
-            
-            summary_row += 1
-            ws_rules[f'A{summary_row}'] = "Avg Business Methods per Service:"
-            ws_rules[f'B{summary_row}'] = f"{business_rules_metrics.get('avg_business_methods_per_service', 0):.2f}"
+            ws_rules.append([])
+            ws_rules.append([])
+            ws_rules.append([excel_cell(ws_rules, "Summary Statistics", 'rnc_bold')])
+            for row in business_rules_summary(metrics):
+                ws_rules.append(row)
         else:
-            ws_rules['A3'] = "Business rules analysis not available (javalang not installed)"
-        
-        ws_rules.column_dimensions['A'].width = 25
-        ws_rules.column_dimensions['B'].width = 40
-        ws_rules.column_dimensions['C'].width = 15
-        ws_rules.column_dimensions['D'].width = 15
-        ws_rules.column_dimensions['E'].width = 20
-        ws_rules.column_dimensions['F'].width = 35
+            ws_rules.append(["Business rules analysis not available (javalang/tree-sitter not installed)"])
 
         # Sheet 6: Analysis Log
-        ws_log = wb.create_sheet("Analysis Log", 5)
-        ws_log['A1'] = "Analysis Log"
-        ws_log['A1'].font = title_font
-        ws_log['A1'].fill = title_fill
-        ws_log.merge_cells('A1:A1')
-        
-        ws_log['A3'] = analysis_log
-        ws_log['A3'].alignment = left_align
-        ws_log.column_dimensions['A'].width = 80
+        ws_log = create_excel_sheet(wb, "Analysis Log", 5, (80,))
+        ws_log.append([excel_cell(ws_log, results.analysis_log, 'rnc_text')])
 
         excel_filename = os.path.join(output_path, f"rnc-{folder_name}.xlsx")
         wb.save(excel_filename)
@@ -631,184 +1199,243 @@ def generate_excel_report(folder_name, output_path):
         print(f"❌ Erro ao gerar relatório Excel: {e}")
         return None
 
-def generate_markdown_report(output_path):
+def generate_excel_report_xlsxwriter(folder_name, output_path, results):
+    """
+    Gera o relatório Excel com xlsxwriter em modo constant_memory: cada linha é gravada
+    em disco assim que escrita, mantendo o uso de memória constante.
+    """
+    excel_filename = os.path.join(output_path, f"rnc-{folder_name}.xlsx")
+    relpath = results.rel_paths.__getitem__
+
+    try:
+        wb = xlsxwriter.Workbook(excel_filename, {'constant_memory': True, 'strings_to_urls': False})
+
+        # Formatos (criados uma única vez e compartilhados por todas as células)
+        title_fmt = wb.add_format({'bold': True, 'font_size': 14, 'font_color': '#FFFFFF', 'bg_color': '#203864'})
+        header_base = {'bold': True, 'font_size': 12, 'font_color': '#FFFFFF', 'bg_color': '#4472C4',
+                       'align': 'center', 'valign': 'vcenter', 'text_wrap': True}
+        header_fmt = wb.add_format({**header_base, 'border': 1})
+        header_plain_fmt = wb.add_format(header_base)
+        body_fmt = wb.add_format({'align': 'left', 'valign': 'top', 'text_wrap': True, 'border': 1})
+        left_fmt = wb.add_format({'align': 'left', 'valign': 'top', 'text_wrap': True})
+        count_fmt = wb.add_format({'bold': True, 'font_size': 11, 'align': 'center', 'valign': 'vcenter', 'text_wrap': True})
+        bold_fmt = wb.add_format({'bold': True, 'font_size': 11})
+
+        def create_sheet(name, widths, title=None):
+            ws = wb.add_worksheet(name)
+            for col, width in enumerate(widths):
+                ws.set_column(col, col, width)
+            if len(widths) > 1:
+                ws.merge_range(0, 0, 0, len(widths) - 1, title or name, title_fmt)
+            else:
+                ws.write(0, 0, title or name, title_fmt)
+            return ws
+
+        def write_rows(ws, headers, rows, fmt=header_fmt):
+            ws.write_row(2, 0, headers, fmt)
+            r = 3
+            for row in rows:
+                ws.write_row(r, 0, row, body_fmt)
+                r += 1
+            return r
+
+        # Sheet 1: Summary
+        ws_summary = create_sheet("Summary", (25, 30), title="RNC Project Discovery - Analysis Report")
+        ws_summary.write_row(2, 0, ["Project Name:", folder_name])
+        ws_summary.write_row(3, 0, ["Analysis Date:", RUN_TIMESTAMP])
+        ws_summary.write_row(4, 0, ["Project Path:", PROJECT_PATH])
+        ws_summary.write_row(6, 0, ["Metric", "Count"], header_plain_fmt)
+        for r, (label, count) in enumerate((("Entity Classes", len(results.entity_classes)),
+                                            ("Business Components", len(results.business_components)),
+                                            ("JSF Pages", len(results.jsf_pages))), start=7):
+            ws_summary.write(r, 0, label, left_fmt)
+            ws_summary.write(r, 1, count, count_fmt)
+
+        # Sheets 2-4: Entity Classes, Business Components, JSF Pages
+        for name, _, widths, headers, rows in excel_table_sheets(results, relpath):
+            write_rows(create_sheet(name, widths), headers, rows)
+
+        # Sheet 5: Business Rules Analysis
+        name, _, widths = BUSINESS_RULES_SHEET
+        ws_rules = create_sheet(name, widths)
+        metrics = results.business_rules_metrics
+        if metrics and HAS_AST_BACKEND:
+            r = write_rows(ws_rules, BUSINESS_RULES_HEADERS, business_rules_rows(metrics, relpath)) + 2
+            ws_rules.write(r, 0, "Summary Statistics", bold_fmt)
+            for r, row in enumerate(business_rules_summary(metrics), start=r + 1):
+                ws_rules.write_row(r, 0, row)
+        else:
+            ws_rules.write(2, 0, "Business rules analysis not available (javalang/tree-sitter not installed)")
+
+        # Sheet 6: Analysis Log
+        ws_log = create_sheet("Analysis Log", (80,))
+        ws_log.write(2, 0, results.analysis_log, left_fmt)
+
+        wb.close()
+        return excel_filename
+
+    except Exception as e:
+        print(f"❌ Erro ao gerar relatório Excel: {e}")
+        return None
+
+def markdown_rules_entries(classes, relpath):
+    """Itens do Markdown para cada classe com regras de negócio (Controllers ou Services)."""
+    for m in classes:
+        yield f"- **{m.class_name}** ({relpath(m.file_path)})\n"
+        yield f"  - Métodos públicos: {m.public_methods}\n"
+        yield f"  - Métodos com regras: {m.business_methods}\n"
+        if m.business_method_label:
+            yield f"  - Métodos: {m.business_method_label}\n"
+        yield "\n"
+
+def generate_markdown_report(output_path, results):
     """Gera o relatório final em formato Markdown."""
     folder_name = os.path.basename(os.path.abspath(PROJECT_PATH))
     report_filename = os.path.join(output_path, f"rnc-{folder_name}.md")
-
-    report = f"# Relatório de Análise Estática do Projeto: `{folder_name}`\n\n"
-    report += f"**Caminho do Projeto:** `{PROJECT_PATH}`\n"
-    report += f"**Data da Análise:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-    report += "---\n\n"
-
-    report += "## 1. Classes de Entidades/Objetos de Persistência\n\n"
-    report += f"**Total de Classes Encontradas:** **{len(entity_classes)}**\n\n"
-    report += "As classes foram identificadas pela presença de anotações JPA/Hibernate comuns (`@Entity`, `@Table`).\n\n"
-    report += "```\n"
-    for path, patterns in entity_classes.items():
-        relative_path = os.path.relpath(path, PROJECT_PATH)
-        patterns_str = ', '.join(p for p in patterns)
-        report += f"* {relative_path} (Padrão: {patterns_str})\n"
-    report += "```\n\n"
-
-    report += "## 2. Classes de Componentes de Negócio/Controladoras/Backing Beans\n\n"
-    report += f"**Total de Classes Encontradas:** **{len(business_components)}**\n\n"
-    report += "As classes foram identificadas por anotações comuns de injeção/gerenciamento (`@Named`, `@Controller`, etc.).\n\n"
-    report += "```\n"
-    for path, patterns in business_components.items():
-        relative_path = os.path.relpath(path, PROJECT_PATH)
-        patterns_str = ', '.join(p for p in patterns)
-        report += f"* {relative_path} (Padrão: {patterns_str})\n"
-    report += "```\n\n"
-
-    report += "## 3. Páginas JSF (XHTML) Encontradas\n\n"
-    report += f"**Total de Páginas Encontradas:** **{len(jsf_pages)}**\n\n"
-    report += "(A ligação exata entre a página JSF e a Entidade/Backing Bean é inferida por análise de código.)\n\n"
-    report += "```\n"
-    for path in jsf_pages:
-        relative_path = os.path.relpath(path, PROJECT_PATH)
-        report += f"* {relative_path}\n"
-    report += "```\n\n"
-
-    report += "## 4. Informações do Banco de Dados (Configurações)\n\n"
-    report += "Análise simples de arquivos de configuração comuns:\n\n"
-    report += db_info_placeholder
-    report += "\n\n"
-
-    report += "## 5. Análise de Regras de Negócio\n\n"
-    if business_rules_metrics and HAS_JAVALANG:
-        report += f"**Total de Classes Analisadas:** {business_rules_metrics.get('total_classes', 0)}\n\n"
-        report += f"**Controllers Encontrados:** {business_rules_metrics.get('total_controllers', 0)}\n\n"
-        report += f"**Services Encontrados:** {business_rules_metrics.get('total_services', 0)}\n\n"
-        report += f"**Métodos com Regras de Negócio:** {business_rules_metrics.get('total_business_methods', 0)}\n\n"
-        
-        avg_per_controller = business_rules_metrics.get('avg_business_methods_per_controller', 0)
-        report += f"**Número Médio de Métodos com Regras de Negócio por Controller:** `{avg_per_controller:.2f}`\n\n"
-        
-        avg_per_service = business_rules_metrics.get('avg_business_methods_per_service', 0)
-        report += f"**Número Médio de Métodos com Regras de Negócio por Service:** `{avg_per_service:.2f}`\n\n"
-        
-        # Detalhar controllers com regras de negócio
-        controllers = business_rules_metrics.get('controllers', [])
-        if controllers:
-            report += "### Controllers com Regras de Negócio\n\n"
-            for controller in controllers:
-                rel_path = os.path.relpath(controller.file_path, PROJECT_PATH)
-                report += f"- **{controller.class_name}** ({rel_path})\n"
-                report += f"  - Métodos públicos: {controller.public_methods}\n"
-                report += f"  - Métodos com regras: {controller.business_methods}\n"
-                if controller.business_method_names:
-                    report += f"  - Métodos: {', '.join(controller.business_method_names)}\n"
-                report += "\n"
-        
-        # Detalhar services com regras de negócio
-        services = business_rules_metrics.get('services', [])
-        if services:
-            report += "### Services com Regras de Negócio\n\n"
-            for service in services:
-                rel_path = os.path.relpath(service.file_path, PROJECT_PATH)
-                report += f"- **{service.class_name}** ({rel_path})\n"
-                report += f"  - Métodos públicos: {service.public_methods}\n"
-                report += f"  - Métodos com regras: {service.business_methods}\n"
-                if service.business_method_names:
-                    report += f"  - Métodos: {', '.join(service.business_method_names)}\n"
-                report += "\n"
+    relpath = results.rel_paths.__getitem__
+
+    parts = [f"# Relatório de Análise Estática do Projeto: `{folder_name}`\n\n"]
+    parts.append(f"**Caminho do Projeto:** `{PROJECT_PATH}`\n")
+    parts.append(f"**Data da Análise:** {RUN_TIMESTAMP}\n\n")
+    parts.append("---\n\n")
+
+    parts.append("## 1. Classes de Entidades/Objetos de Persistência\n\n")
+    parts.append(f"**Total de Classes Encontradas:** **{len(results.entity_classes)}**\n\n")
+    parts.append("As classes foram identificadas pela presença de anotações JPA/Hibernate comuns (`@Entity`, `@Table`).\n\n")
+    parts.append("```\n")
+    parts.extend(f"* {relpath(path)} (Padrão: {label})\n" for path, label in results.entity_labels.items())
+    parts.append("```\n\n")
+
+    parts.append("## 2. Classes de Componentes de Negócio/Controladoras/Backing Beans\n\n")
+    parts.append(f"**Total de Classes Encontradas:** **{len(results.business_components)}**\n\n")
+    parts.append("As classes foram identificadas por anotações comuns de injeção/gerenciamento (`@Named`, `@Controller`, etc.).\n\n")
+    parts.append("```\n")
+    parts.extend(f"* {relpath(path)} (Padrão: {label})\n" for path, label in results.component_labels.items())
+    parts.append("```\n\n")
+
+    parts.append("## 3. Páginas JSF (XHTML) Encontradas\n\n")
+    parts.append(f"**Total de Páginas Encontradas:** **{len(results.jsf_pages)}**\n\n")
+    parts.append("(A ligação exata entre a página JSF e a Entidade/Backing Bean é inferida por análise de código.)\n\n")
+    parts.append("```\n")
+    parts.extend(f"* {relpath(path)}\n" for path in results.jsf_pages)
+    parts.append("```\n\n")
+
+    parts.append("## 4. Informações do Banco de Dados (Configurações)\n\n")
+    parts.append("Análise simples de arquivos de configuração comuns:\n\n")
+    parts.append(results.db_info)
+    parts.append("\n\n")
+
+    parts.append("## 5. Análise de Regras de Negócio\n\n")
+    if results.business_rules_metrics and HAS_AST_BACKEND:
+        parts.append(f"**Total de Classes Analisadas:** {results.business_rules_metrics.get('total_classes', 0)}\n\n")
+        parts.append(f"**Controllers Encontrados:** {results.business_rules_metrics.get('total_controllers', 0)}\n\n")
+        parts.append(f"**Services Encontrados:** {results.business_rules_metrics.get('total_services', 0)}\n\n")
+        parts.append(f"**Métodos com Regras de Negócio:** {results.business_rules_metrics.get('total_business_methods', 0)}\n\n")
+        
+        avg_per_controller = results.business_rules_metrics.get('avg_business_methods_per_controller', 0)
+        parts.append(f"**Número Médio de Métodos com Regras de Negócio por Controller:** `{avg_per_controller:.2f}`\n\n")
+        
+        avg_per_service = results.business_rules_metrics.get('avg_business_methods_per_service', 0)
+        parts.append(f"**Número Médio de Métodos com Regras de Negócio por Service:** `{avg_per_service:.2f}`\n\n")
+        
+        for kind in ('Controllers', 'Services'):
+            classes = results.business_rules_metrics.get(kind.lower(), [])
+            if classes:
+                parts.append(f"### {kind} com Regras de Negócio\n\n")
+                parts.extend(markdown_rules_entries(classes, relpath))
     else:
-        report += "⚠️ Análise de regras de negócio não disponível (javalang não instalado).\n\n"
+        parts.append("⚠️ Análise de regras de negócio não disponível (javalang/tree-sitter não instalados).\n\n")
 
-    report += "## 6. Log de Execução\n\n"
-    report += "```\n"
-    report += analysis_log
-    report += "```\n"
+    parts.append("## 6. Log de Execução\n\n")
+    parts.append("```\n")
+    parts.extend(results.log)
+    parts.append("```\n")
 
-    return report, report_filename
+    return "".join(parts), report_filename
 
-def generate_html_report(output_path):
-    """Gera um relatório HTML profissional com CSS incorporado."""
-    folder_name = os.path.basename(os.path.abspath(PROJECT_PATH))
-    html_filename = os.path.join(output_path, f"rnc-{folder_name}.html")
-    
-    # Escape HTML entities
-    def escape_html(text):
-        return str(text).replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('"', '&quot;').replace("'", '&#39;')
-    
-    html = f"""<!DOCTYPE html>
+# Trechos estáticos do relatório HTML. Ficam fora da função para não serem
+# remontados a cada chamada; só os campos entre chaves variam (format_map).
+HTML_DOC_START = """<!DOCTYPE html>
 <html lang="pt-BR">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>RNC Project Discovery - {escape_html(folder_name)}</title>
-    <style>
-        * {{
+    <title>RNC Project Discovery - {folder_name}</title>
+"""
+
+# CSS e abertura do cabeçalho: nenhum campo variável, então o bloco já fica em bytes
+# UTF-8 e é escrito como está, sem format_map nem codificação a cada relatório.
+HTML_STYLE = """    <style>
+        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
         
-        body {{
+        body {
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
             line-height: 1.6;
             color: #333;
             background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%);
             min-height: 100vh;
             padding: 20px;
-        }}
+        }
         
-        .container {{
+        .container {
             max-width: 1200px;
             margin: 0 auto;
             background: white;
             border-radius: 12px;
             box-shadow: 0 10px 40px rgba(0,0,0,0.15);
             overflow: hidden;
-        }}
+        }
         
-        header {{
+        header {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             color: white;
             padding: 40px 20px;
             text-align: center;
-        }}
+        }
         
-        header h1 {{
+        header h1 {
             font-size: 2.5em;
             margin-bottom: 10px;
             text-shadow: 0 2px 4px rgba(0,0,0,0.2);
-        }}
+        }
         
-        .meta-info {{
+        .meta-info {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
             gap: 15px;
             margin-top: 20px;
             font-size: 0.95em;
             opacity: 0.95;
-        }}
+        }
         
-        .meta-info div {{
+        .meta-info div {
             background: rgba(255,255,255,0.1);
             padding: 10px 15px;
             border-radius: 6px;
             backdrop-filter: blur(10px);
-        }}
+        }
         
-        .meta-info strong {{
+        .meta-info strong {
             display: block;
             margin-bottom: 5px;
             font-size: 0.85em;
             text-transform: uppercase;
             letter-spacing: 0.5px;
-        }}
+        }
         
-        main {{
+        main {
             padding: 40px;
-        }}
+        }
         
-        section {{
+        section {
             margin-bottom: 50px;
-        }}
+        }
         
-        h2 {{
+        h2 {
             font-size: 1.8em;
             color: #667eea;
             margin-bottom: 20px;
@@ -817,23 +1444,23 @@ def generate_html_report(output_path):
             display: flex;
             align-items: center;
             gap: 10px;
-        }}
+        }
         
-        h3 {{
+        h3 {
             font-size: 1.3em;
             color: #764ba2;
             margin: 25px 0 15px 0;
             margin-top: 30px;
-        }}
+        }
         
-        .stats-grid {{
+        .stats-grid {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
             gap: 20px;
             margin-bottom: 30px;
-        }}
+        }
         
-        .stat-card {{
+        .stat-card {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             color: white;
             padding: 25px;
@@ -841,26 +1468,26 @@ def generate_html_report(output_path):
             text-align: center;
             box-shadow: 0 4px 15px rgba(102,126,234,0.3);
             transition: transform 0.3s ease;
-        }}
+        }
         
-        .stat-card:hover {{
+        .stat-card:hover {
             transform: translateY(-5px);
-        }}
+        }
         
-        .stat-card .number {{
+        .stat-card .number {
             font-size: 2.5em;
             font-weight: bold;
             margin-bottom: 5px;
-        }}
+        }
         
-        .stat-card .label {{
+        .stat-card .label {
             font-size: 0.9em;
             opacity: 0.9;
             text-transform: uppercase;
             letter-spacing: 0.5px;
-        }}
+        }
         
-        table {{
+        table {
             width: 100%;
             border-collapse: collapse;
             margin-bottom: 20px;
@@ -868,98 +1495,98 @@ def generate_html_report(output_path):
             border-radius: 8px;
             overflow: hidden;
             box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-        }}
+        }
         
-        thead {{
+        thead {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             color: white;
-        }}
+        }
         
-        th {{
+        th {
             padding: 15px;
             text-align: left;
             font-weight: 600;
             text-transform: uppercase;
             font-size: 0.85em;
             letter-spacing: 0.5px;
-        }}
+        }
         
-        td {{
+        td {
             padding: 12px 15px;
             border-bottom: 1px solid #eee;
-        }}
+        }
         
-        tbody tr:hover {{
+        tbody tr:hover {
             background: #f8f9ff;
-        }}
+        }
         
-        tbody tr:last-child td {{
+        tbody tr:last-child td {
             border-bottom: none;
-        }}
+        }
         
-        .file-list {{
+        .file-list {
             background: #f8f9ff;
             border-left: 4px solid #667eea;
             padding: 20px;
             border-radius: 6px;
             margin-bottom: 20px;
-        }}
+        }
         
-        .file-list ul {{
+        .file-list ul {
             list-style: none;
             margin-left: 0;
-        }}
+        }
         
-        .file-list li {{
+        .file-list li {
             padding: 8px 0;
             border-bottom: 1px solid #ddd;
-        }}
+        }
         
-        .file-list li:last-child {{
+        .file-list li:last-child {
             border-bottom: none;
-        }}
+        }
         
-        .file-list code {{
+        .file-list code {
             background: white;
             padding: 3px 8px;
             border-radius: 4px;
             font-family: 'Courier New', monospace;
             font-size: 0.9em;
             color: #764ba2;
-        }}
+        }
         
-        .table-responsive {{
+        .table-responsive {
             overflow-x: auto;
             margin-bottom: 30px;
-        }}
+        }
         
-        .table-title {{
+        .table-title {
             font-size: 1.1em;
             color: #667eea;
             margin-bottom: 10px;
             font-weight: 600;
-        }}
+        }
         
-        .method-item {{
+        .method-item {
             background: #f8f9ff;
             padding: 15px;
             border-left: 4px solid #764ba2;
             margin-bottom: 15px;
             border-radius: 6px;
-        }}
+        }
         
-        .method-item h4 {{
+        .method-item h4 {
             color: #764ba2;
             margin-bottom: 8px;
-        }}
+        }
         
-        .method-item .details {{
+        .method-item .details {
             font-size: 0.9em;
             color: #666;
             margin-top: 5px;
-        }}
+        }
         
-        .method-item .methods {{
+        .method-item .methods {
             background: white;
             padding: 10px;
             border-radius: 4px;
@@ -967,9 +1594,9 @@ def generate_html_report(output_path):
             font-family: 'Courier New', monospace;
             font-size: 0.85em;
             color: #667eea;
-        }}
+        }
         
-        .log-box {{
+        .log-box {
             background: #1e1e1e;
             color: #00ff00;
             padding: 20px;
@@ -981,23 +1608,23 @@ def generate_html_report(output_path):
             word-wrap: break-word;
             line-height: 1.5;
             border: 2px solid #333;
-        }}
+        }
         
-        footer {{
+        footer {
             background: #f5f7fa;
             padding: 30px 40px;
             text-align: center;
             color: #666;
             border-top: 1px solid #ddd;
             font-size: 0.9em;
-        }}
+        }
         
-        .icon {{
+        .icon {
             display: inline-block;
             margin-right: 8px;
-        }}
+        }
         
-        .badge {{
+        .badge {
             display: inline-block;
             padding: 4px 12px;
             border-radius: 20px;
@@ -1005,87 +1632,87 @@ def generate_html_report(output_path):
             font-weight: 600;
             margin-right: 8px;
             margin-top: 8px;
-        }}
+        }
         
-        .badge-success {{
+        .badge-success {
             background: #d4edda;
             color: #155724;
-        }}
+        }
         
-        .badge-info {{
+        .badge-info {
             background: #d1ecf1;
             color: #0c5460;
-        }}
+        }
         
-        .badge-warning {{
+        .badge-warning {
             background: #fff3cd;
             color: #856404;
-        }}
+        }
         
-        @media (max-width: 768px) {{
-            header h1 {{
+        @media (max-width: 768px) {
+            header h1 {
                 font-size: 1.8em;
-            }}
+            }
             
-            main {{
+            main {
                 padding: 20px;
-            }}
+            }
             
-            .stats-grid {{
+            .stats-grid {
                 grid-template-columns: 1fr;
-            }}
+            }
             
-            table {{
+            table {
                 font-size: 0.85em;
-            }}
+            }
             
-            th, td {{
+            th, td {
                 padding: 8px;
-            }}
+            }
             
-            .table-responsive {{
+            .table-responsive {
                 overflow-x: auto;
                 -webkit-overflow-scrolling: touch;
-            }}
+            }
             
-            table {{
+            table {
                 min-width: 500px;
-            }}
+            }
             
-            h2 {{
+            h2 {
                 font-size: 1.3em;
-            }}
+            }
             
-            h3 {{
+            h3 {
                 font-size: 1.1em;
-            }}
-        }}
+            }
+        }
         
-        @media (max-width: 480px) {{
-            header h1 {{
+        @media (max-width: 480px) {
+            header h1 {
                 font-size: 1.4em;
-            }}
+            }
             
-            main {{
+            main {
                 padding: 15px;
-            }}
+            }
             
-            table {{
+            table {
                 font-size: 0.75em;
-            }}
+            }
             
-            th, td {{
+            th, td {
                 padding: 6px;
-            }}
+            }
             
-            .stat-card {{
+            .stat-card {
                 padding: 15px;
-            }}
+            }
             
-            .stat-card .number {{
+            .stat-card .number {
                 font-size: 2em;
-            }}
-        }}
+            }
+        }
     </style>
 </head>
 <body>
@@ -1096,15 +1723,17 @@ def generate_html_report(output_path):
             <div class="meta-info">
                 <div>
                     <strong>Projeto</strong>
-                    {escape_html(folder_name)}
+""".encode('utf-8')
+
+HTML_HEAD = """                    {folder_name}
                 </div>
                 <div>
                     <strong>Data Análise</strong>
-                    {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}
+                    {now}
                 </div>
                 <div>
                     <strong>Caminho</strong>
-                    {escape_html(PROJECT_PATH)}
+                    {project_path}
                 </div>
             </div>
         </header>
@@ -1115,19 +1744,19 @@ def generate_html_report(output_path):
                 <h2>📈 Resumo Executivo</h2>
                 <div class="stats-grid">
                     <div class="stat-card">
-                        <div class="number">{len(entity_classes)}</div>
+                        <div class="number">{total_entities}</div>
                         <div class="label">Classes de Entidades</div>
                     </div>
                     <div class="stat-card">
-                        <div class="number">{len(business_components)}</div>
+                        <div class="number">{total_components}</div>
                         <div class="label">Componentes de Negócio</div>
                     </div>
                     <div class="stat-card">
-                        <div class="number">{len(jsf_pages)}</div>
+                        <div class="number">{total_jsf}</div>
                         <div class="label">Páginas JSF</div>
                     </div>
                     <div class="stat-card">
-                        <div class="number">{business_rules_metrics.get('total_business_methods', 0)}</div>
+                        <div class="number">{total_business_methods}</div>
                         <div class="label">Métodos com Regras</div>
                     </div>
                 </div>
@@ -1136,117 +1765,72 @@ def generate_html_report(output_path):
             <!-- SEÇÃO 2: CLASSES DE ENTIDADES -->
             <section>
                 <h2>🗄️ Classes de Entidades/Objetos de Persistência</h2>
-                <p><strong>Total encontrado:</strong> <span class="badge badge-info">{len(entity_classes)}</span></p>
+                <p><strong>Total encontrado:</strong> <span class="badge badge-info">{total_entities}</span></p>
                 <p>Classes identificadas pela presença de anotações JPA/Hibernate comuns (<code>@Entity</code>, <code>@Table</code>).</p>
-                <div class="table-responsive">
-                    <div class="table-title">Detalhes das Classes de Entidades</div>
-                    <table>
-                        <thead>
-                            <tr>
-                                <th>Caminho do Arquivo</th>
-                                <th>Padrões Detectados</th>
-                            </tr>
-                        </thead>
-                        <tbody>
 """
-    
-    # Adicionar entidades em tabela
-    for filepath, patterns in entity_classes.items():
-        relative_path = os.path.relpath(filepath, PROJECT_PATH)
-        patterns_str = ', '.join(patterns) if patterns else 'N/A'
-        html += f'                            <tr><td><code>{escape_html(relative_path)}</code></td><td>{escape_html(patterns_str)}</td></tr>\n'
-    
-    html += """                        </tbody>
-                    </table>
-                </div>
-            </section>
+
+HTML_COMPONENTS_HEAD = """            </section>
             
             <!-- SEÇÃO 3: COMPONENTES DE NEGÓCIO -->
             <section>
                 <h2>🔧 Classes de Componentes de Negócio/Controladoras</h2>
-                <p><strong>Total encontrado:</strong> <span class="badge badge-success">{}</span></p>
+                <p><strong>Total encontrado:</strong> <span class="badge badge-success">{total}</span></p>
                 <p>Classes identificadas por anotações comuns de injeção/gerenciamento (<code>@Named</code>, <code>@Controller</code>, etc.).</p>
-                <div class="table-responsive">
-                    <div class="table-title">Detalhes dos Componentes de Negócio</div>
-                    <table>
-                        <thead>
-                            <tr>
-                                <th>Caminho do Arquivo</th>
-                                <th>Anotações Detectadas</th>
-                            </tr>
-                        </thead>
-                        <tbody>
-""".format(len(business_components))
-    
-    # Adicionar componentes em tabela
-    for filepath, patterns in business_components.items():
-        relative_path = os.path.relpath(filepath, PROJECT_PATH)
-        patterns_str = ', '.join(patterns) if patterns else 'N/A'
-        html += f'                            <tr><td><code>{escape_html(relative_path)}</code></td><td>{escape_html(patterns_str)}</td></tr>\n'
-    
-    html += """                        </tbody>
-                    </table>
-                </div>
-            </section>
+"""
+
+HTML_JSF_HEAD = """            </section>
             
             <!-- SEÇÃO 4: PÁGINAS JSF -->
             <section>
                 <h2>🖼️ Páginas JSF (XHTML)</h2>
-                <p><strong>Total encontrado:</strong> <span class="badge badge-warning">{}</span></p>
+                <p><strong>Total encontrado:</strong> <span class="badge badge-warning">{total}</span></p>
                 <p>Arquivos de view utilizados em aplicações JSF.</p>
-                <div class="table-responsive">
-                    <div class="table-title">Detalhes das Páginas JSF</div>
-                    <table>
-                        <thead>
-                            <tr>
-                                <th>Caminho do Arquivo</th>
-                                <th>Tipo</th>
-                            </tr>
-                        </thead>
-                        <tbody>
-""".format(len(jsf_pages))
-    
-    # Adicionar páginas JSF em tabela
-    for filepath in jsf_pages:
-        relative_path = os.path.relpath(filepath, PROJECT_PATH)
-        file_type = os.path.splitext(filepath)[1]
-        html += f'                            <tr><td><code>{escape_html(relative_path)}</code></td><td>{escape_html(file_type)}</td></tr>\n'
-    
-    html += """                        </tbody>
-                    </table>
-                </div>
-            </section>
-            
-            <!-- SEÇÃO 5: ANÁLISE DE REGRAS DE NEGÓCIO -->
-            <section>
-                <h2>🧠 Análise de Regras de Negócio</h2>
 """
-    
-    if business_rules_metrics and HAS_JAVALANG:
-        html += f"""                <div class="stats-grid">
+
+HTML_RULES_STATS = """                <div class="stats-grid">
                     <div class="stat-card">
-                        <div class="number">{business_rules_metrics.get('total_classes', 0)}</div>
+                        <div class="number">{total_classes}</div>
                         <div class="label">Classes Analisadas</div>
                     </div>
                     <div class="stat-card">
-                        <div class="number">{business_rules_metrics.get('total_controllers', 0)}</div>
+                        <div class="number">{total_controllers}</div>
                         <div class="label">Controllers</div>
                     </div>
                     <div class="stat-card">
-                        <div class="number">{business_rules_metrics.get('total_services', 0)}</div>
+                        <div class="number">{total_services}</div>
                         <div class="label">Services</div>
                     </div>
                     <div class="stat-card">
-                        <div class="number">{business_rules_metrics.get('avg_business_methods_per_service', 0):.2f}</div>
+                        <div class="number">{avg_business_methods_per_service:.2f}</div>
                         <div class="label">Média por Service</div>
                     </div>
                 </div>
 """
+
+HTML_FOOTER = """            </section>
+            
+            <!-- SEÇÃO 6: LOG DE EXECUÇÃO -->
+            <section>
+                <h2>📋 Log de Execução</h2>
+                <pre class="log-box">{log}</pre>
+            </section>
+        </main>
         
-        # Controllers com regras
-        controllers = business_rules_metrics.get('controllers', [])
-        if controllers:
-            html += """                <h3>Controllers com Regras de Negócio</h3>
+        <footer>
+            <p>📊 Relatório gerado automaticamente por RNC Project Discovery</p>
+            <p style="margin-top: 10px; font-size: 0.85em; color: #999;">
+                Versão 1.0 | {now_long}
+            </p>
+        </footer>
+    </div>
+</body>
+</html>
+"""
+
+# Linhas das tabelas: arquivos (caminho + detalhe) e classes com regras de negócio.
+HTML_FILE_ROW = '                            <tr><td><code>{}</code></td><td>{}</td></tr>\n'
+
+HTML_RULES_TABLE_HEAD = """                <h3>{kind} com Regras de Negócio</h3>
                 <div class="table-responsive">
                     <table>
                         <thead>
@@ -1260,87 +1844,153 @@ def generate_html_report(output_path):
                         </thead>
                         <tbody>
 """
-            for controller in controllers:
-                rel_path = os.path.relpath(controller.file_path, PROJECT_PATH)
-                methods_str = ', '.join(controller.business_method_names) if controller.business_method_names else '-'
-                html += f"""                            <tr>
-                                <td><strong>{escape_html(controller.class_name)}</strong></td>
-                                <td><code>{escape_html(rel_path)}</code></td>
-                                <td>{controller.public_methods}</td>
-                                <td><span class="badge badge-success">{controller.business_methods}</span></td>
-                                <td>{escape_html(methods_str)}</td>
+
+HTML_RULES_ROW = """                            <tr>
+                                <td><strong>{}</strong></td>
+                                <td><code>{}</code></td>
+                                <td>{}</td>
+                                <td><span class="badge badge-success">{}</span></td>
+                                <td>{}</td>
                             </tr>
 """
-            html += """                        </tbody>
-                    </table>
-                </div>
-"""
-        
-        # Services com regras
-        services = business_rules_metrics.get('services', [])
-        if services:
-            html += """                <h3>Services com Regras de Negócio</h3>
-                <div class="table-responsive">
+
+HTML_FILE_TABLE_HEAD = """                <div class="table-responsive">
+                    <div class="table-title">{title}</div>
                     <table>
                         <thead>
                             <tr>
-                                <th>Classe</th>
-                                <th>Arquivo</th>
-                                <th>Métodos Públicos</th>
-                                <th>Métodos com Regras</th>
-                                <th>Nomes dos Métodos</th>
+                                <th>Caminho do Arquivo</th>
+                                <th>{detail}</th>
                             </tr>
                         </thead>
                         <tbody>
 """
-            for service in services:
-                rel_path = os.path.relpath(service.file_path, PROJECT_PATH)
-                methods_str = ', '.join(service.business_method_names) if service.business_method_names else '-'
-                html += f"""                            <tr>
-                                <td><strong>{escape_html(service.class_name)}</strong></td>
-                                <td><code>{escape_html(rel_path)}</code></td>
-                                <td>{service.public_methods}</td>
-                                <td><span class="badge badge-success">{service.business_methods}</span></td>
-                                <td>{escape_html(methods_str)}</td>
-                            </tr>
-"""
-            html += """                        </tbody>
+
+HTML_EMPTY_SECTION = "                <p><em>Nenhum item encontrado.</em></p>\n"
+
+HTML_TABLE_END = """                        </tbody>
                     </table>
                 </div>
 """
-    else:
-        html += "                <p><em>⚠️ Análise de regras de negócio não disponível (javalang não instalado).</em></p>\n"
-    
-    # SEÇÃO 6: LOG
-    html += f"""            </section>
-            
-            <!-- SEÇÃO 6: LOG DE EXECUÇÃO -->
-            <section>
-                <h2>📋 Log de Execução</h2>
-                <div class="log-box">{escape_html(analysis_log)}</div>
-            </section>
-        </main>
-        
-        <footer>
-            <p>📊 Relatório gerado automaticamente por RNC Project Discovery</p>
-            <p style="margin-top: 10px; font-size: 0.85em; color: #999;">
-                Versão 1.0 | {datetime.now().strftime('%d de %B de %Y às %H:%M:%S')}
-            </p>
-        </footer>
-    </div>
-</body>
-</html>
-"""
+
+def escape_html(text):
+    """Escapa entidades HTML (&, <, >, aspas) com o html.escape da biblioteca padrão."""
+    # Quase sempre já é str (caminhos, nomes de classe); str() só para números e afins
+    return escape(text if type(text) is str else str(text), quote=True)
+
+def write_html_file_table(w, title, detail, rows):
+    """Escreve a tabela de arquivos de uma seção; sem linhas, apenas um aviso no lugar da tabela."""
+    if not rows:
+        w(HTML_EMPTY_SECTION)
+        return
+    w(HTML_FILE_TABLE_HEAD.format_map({'title': title, 'detail': detail}))
+    w("".join(rows))
+    w(HTML_TABLE_END)
+
+def write_html_rules_table(w, kind, classes, html_path):
+    """Escreve a tabela de Controllers ou Services com regras de negócio."""
+    w(HTML_RULES_TABLE_HEAD.format_map({'kind': kind}))
+    w("".join(
+        HTML_RULES_ROW.format(escape_html(m.class_name), html_path(m.file_path), m.public_methods,
+                              m.business_methods, escape_html(m.business_method_label or '-'))
+        for m in classes
+    ))
+    w(HTML_TABLE_END)
+
+def generate_html_report(output_path, results):
+    """Gera um relatório HTML profissional com CSS incorporado."""
+    folder_name = os.path.basename(os.path.abspath(PROJECT_PATH))
+    html_filename = os.path.join(output_path, f"rnc-{folder_name}.html")
     
     try:
-        with open(html_filename, 'w', encoding='utf-8') as f:
-            f.write(html)
+        # Cada fragmento vai direto para o buffer do arquivo; o documento
+        # nunca existe inteiro em memória.
+        with open(html_filename, 'wb', buffering=1 << 20) as f:
+            write_html_report(f, folder_name, results)
         return html_filename
     except Exception as e:
         print(f"❌ Erro ao gerar relatório HTML: {e}")
         return None
 
-def save_and_display_report(report_content, md_filename, excel_filename=None):
+def write_html_report(f, folder_name, results):
+    """Escreve o relatório HTML, fragmento a fragmento, no arquivo binário `f`."""
+    write = f.write
+
+    def w(text):
+        write(text.encode('utf-8'))
+
+    # Caminhos relativos já escapados: cada arquivo é escapado uma vez, mesmo
+    # aparecendo em mais de uma tabela.
+    html_path = {path: escape_html(rel) for path, rel in results.rel_paths.items()}.__getitem__
+    now = RUN_STARTED or datetime.now()  # O mesmo instante do Markdown, do Excel e do log
+    
+    folder_name = escape_html(folder_name)
+    w(HTML_DOC_START.format_map({'folder_name': folder_name}))
+    write(HTML_STYLE)
+    w(HTML_HEAD.format_map({
+        'folder_name': folder_name,
+        'now': now.strftime('%d/%m/%Y %H:%M:%S'),
+        'project_path': escape_html(PROJECT_PATH),
+        'total_entities': len(results.entity_classes),
+        'total_components': len(results.business_components),
+        'total_jsf': len(results.jsf_pages),
+        'total_business_methods': results.business_rules_metrics.get('total_business_methods', 0),
+    }))
+    
+    # Adicionar entidades em tabela (uma única escrita por tabela)
+    write_html_file_table(w, "Detalhes das Classes de Entidades", "Padrões Detectados", [
+        HTML_FILE_ROW.format(html_path(filepath), escape_html(label or "N/A"))
+        for filepath, label in results.entity_labels.items()
+    ])
+    
+    w(HTML_COMPONENTS_HEAD.format_map({'total': len(results.business_components)}))
+    
+    # Adicionar componentes em tabela
+    write_html_file_table(w, "Detalhes dos Componentes de Negócio", "Anotações Detectadas", [
+        HTML_FILE_ROW.format(html_path(filepath), escape_html(label or "N/A"))
+        for filepath, label in results.component_labels.items()
+    ])
+    
+    w(HTML_JSF_HEAD.format_map({'total': len(results.jsf_pages)}))
+    
+    # Adicionar páginas JSF em tabela
+    write_html_file_table(w, "Detalhes das Páginas JSF", "Tipo", [
+        HTML_FILE_ROW.format(html_path(filepath), escape_html(filepath[filepath.rfind('.'):]))
+        for filepath in results.jsf_pages
+    ])
+    
+    w("""            </section>
+            
+            <!-- SEÇÃO 5: ANÁLISE DE REGRAS DE NEGÓCIO -->
+            <section>
+                <h2>🧠 Análise de Regras de Negócio</h2>
+""")
+    
+    if results.business_rules_metrics and HAS_AST_BACKEND:
+        metrics = results.business_rules_metrics
+        w(HTML_RULES_STATS.format_map({
+            'total_classes': metrics.get('total_classes', 0),
+            'total_controllers': metrics.get('total_controllers', 0),
+            'total_services': metrics.get('total_services', 0),
+            'avg_business_methods_per_service': metrics.get('avg_business_methods_per_service', 0),
+        }))
+        
+        for kind in ('Controllers', 'Services'):
+            classes = metrics.get(kind.lower(), [])
+            if classes:
+                write_html_rules_table(w, kind, classes, html_path)
+        if not (metrics.get('controllers') or metrics.get('services')):
+            w(HTML_EMPTY_SECTION)
+    else:
+        w("                <p><em>⚠️ Análise de regras de negócio não disponível (javalang/tree-sitter não instalados).</em></p>\n")
+    
+    # SEÇÃO 6: LOG
+    w(HTML_FOOTER.format_map({
+        'log': escape_html(results.analysis_log),
+        'now_long': now.strftime('%d de %B de %Y às %H:%M:%S'),
+    }))
+
+def save_and_display_report(report_content, md_filename, results, excel_filename=None):
     """Salva os relatórios em Markdown, Excel e HTML, e exibe o resumo no terminal."""
     try:
         with open(md_filename, 'w', encoding='utf-8') as f:
@@ -1354,7 +2004,7 @@ def save_and_display_report(report_content, md_filename, excel_filename=None):
 
     # Gerar HTML
     output_path = os.path.dirname(md_filename)
-    html_filename = generate_html_report(output_path)
+    html_filename = generate_html_report(output_path, results)
     if html_filename:
         print(f"✅ Relatório HTML salvo em: {html_filename}")
 
@@ -1362,10 +2012,10 @@ def save_and_display_report(report_content, md_filename, excel_filename=None):
     print("RESUMO DA ANÁLISE ESTATICA")
     print("="*80)
     print(f"Projeto Analisado: {os.path.basename(os.path.abspath(PROJECT_PATH))}")
-    print(f"Total de Entidades: {len(entity_classes)}")
-    print(f"Total de Componentes de Negócio/Controladoras: {len(business_components)}")
-    print(f"Total de Páginas JSF: {len(jsf_pages)}")
-    found_db = "Sim" if "Arquivos de Configuração de Banco de Dados Encontrados" in db_info_placeholder else "Não"
+    print(f"Total de Entidades: {len(results.entity_classes)}")
+    print(f"Total de Componentes de Negócio/Controladoras: {len(results.business_components)}")
+    print(f"Total de Páginas JSF: {len(results.jsf_pages)}")
+    found_db = "Sim" if results.has_db_config else "Não"
     print(f"Informações de DB Encontradas: {found_db}")
     print("="*80)
     print(f"📂 Arquivos de saída estão em: {os.path.dirname(md_filename)}/")
@@ -1390,6 +2040,8 @@ if __name__ == "__main__":
 
     PROJECT_PATH = sys.argv[1]
     PROJECT_PATH = os.path.abspath(PROJECT_PATH)
+    RUN_STARTED = datetime.now()
+    RUN_TIMESTAMP = RUN_STARTED.strftime('%Y-%m-%d %H:%M:%S')
 
     if not os.path.isdir(PROJECT_PATH):
         print(f"\n🛑 ERRO: O caminho '{PROJECT_PATH}' não é um diretório válido.")
@@ -1399,11 +2051,11 @@ if __name__ == "__main__":
     output_folder_path = create_output_folder(PROJECT_PATH)
 
     # Executar análise
-    run_analysis(PROJECT_PATH)
+    results = run_analysis(PROJECT_PATH)
 
     # Gerar relatórios
-    report_content, md_filename = generate_markdown_report(output_folder_path)
-    excel_filename = generate_excel_report(os.path.basename(os.path.abspath(PROJECT_PATH)), output_folder_path)
+    report_content, md_filename = generate_markdown_report(output_folder_path, results)
+    excel_filename = generate_excel_report(os.path.basename(os.path.abspath(PROJECT_PATH)), output_folder_path, results)
 
     # Salvar e exibir resultados
-    save_and_display_report(report_content, md_filename, excel_filename)
\ No newline at end of file
+    save_and_display_report(report_content, md_filename, results, excel_filename)
\ No newline at end of file